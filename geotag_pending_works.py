@@ -3,6 +3,7 @@ import json
 import statistics
 import os
 import logging
+from logging.handlers import RotatingFileHandler
 from datetime import datetime
 from typing import Dict, Any, Optional
 import anthropic
@@ -13,7 +14,7 @@ logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler("nregs_geotag.log"),
+        RotatingFileHandler("nregs_geotag.log", maxBytes=5 * 1024 * 1024, backupCount=3, delay=True),
         logging.StreamHandler()
     ]
 )
@@ -22,6 +23,121 @@ logger = logging.getLogger(__name__)
 # Load environment variables from .env file
 load_dotenv()
 
+# Create output directory once for all files written by this module
+os.makedirs("output", exist_ok=True)
+
+# Anthropic client shared by all Claude calls, created on first use
+_anthropic_client: Optional[anthropic.Anthropic] = None
+
+def get_anthropic_client(api_key):
+    """
+    Return the module-level Anthropic client, creating it on first use
+    
+    Args:
+        api_key (str): Anthropic API key
+    
+    Returns:
+        anthropic.Anthropic: Shared client
+    """
+    global _anthropic_client
+    if _anthropic_client is None:
+        _anthropic_client = anthropic.Anthropic(api_key=api_key)
+    return _anthropic_client
+
+def write_output_file(path, content):
+    """
+    Atomically write text to an output file through a temporary file
+    
+    Args:
+        path (str): Destination file path
+        content (str): Text to write
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb', buffering=1 << 16) as f:
+        f.write(content.encode('utf-8'))
+    os.replace(tmp_path, path)
+
+# Fields of a district/block record that the analysis prompt actually uses
+_PROMPT_RECORD_FIELDS = (
+    'group_name',
+    'geotag_marks',
+    'pending_percentage_geotag',
+    'pending_percentage_phase_0_assets',
+    'pending_percentage_phase_1_before',
+    'pending_percentage_phase_2_during',
+    'pending_percentage_phase_3_after',
+    'phase_0_assets_geotag_marks',
+    'phase_1_before_geotag_marks',
+    'phase_2_during_geotag_marks',
+    'phase_3_after_geotag_marks'
+)
+
+def _project_record(record):
+    """Copy only the prompt fields of a district/block record"""
+    if not record:
+        return record
+    return {key: record[key] for key in _PROMPT_RECORD_FIELDS if key in record}
+
+# Prompt template for the geotag analysis, filled in by generate_geotag_analysis
+_PROMPT_TEMPLATE = """
+You are an AI analyst tasked with evaluating the performance of districts and blocks in Madhya Pradesh, India,
+based on the National Rural Employment Guarantee Act (NREGA) data. Your goal is to provide a concise, 
+professional analysis of a target district's performance in relation to the state's top and bottom performers,
+as well as an assessment of the blocks within the target district.
+
+You will be provided with the following data:
+
+<state_data>
+{state_data}
+</state_data>
+
+<district_data>
+{district_data}
+</district_data>
+
+The target district for analysis is:
+<target_district>{target_district}</target_district>
+
+Analyze the provided data and generate a brief, professional report that includes:
+
+1. A comparison of the target district's performance to the state's top and bottom performers, highlighting strengths and weaknesses.
+2. An evaluation of the blocks within the target district, identifying high-performing and underperforming blocks.
+
+Your analysis should be precise, concise, and use professional language.
+Focus on the geotagging of works across different phases:
+
+1. Phase 0: Assets geotagging
+2. Phase 1: Before work geotagging
+3. Phase 2: During work geotagging
+4. Phase 3: After work geotagging
+
+Marks are awarded proportionately based on the percentage of works pending geotagging in each phase. Lower pending percentages indicate better performance.
+
+Present your analysis in the following format:
+
+<analysis>
+<district_performance>
+[Provide a 2-3 sentence analysis of the target district's performance compared to the top and bottom districts in the state. Highlight key strengths and weaknesses in geotagging activities.]
+</district_performance>
+
+<phase_comparison>
+[Provide a 2-3 sentence analysis comparing the district's performance across the different phases. Identify which phases are strongest and which need improvement.]
+</phase_comparison>
+
+<block_performance>
+[Provide a 2-3 sentence analysis of the blocks within the target district, identifying the highest and lowest performers and any notable trends in geotagging completion.]
+</block_performance>
+
+<recommendations>
+[Offer 1-2 concise, data-driven recommendations for improving the target district's geotagging performance, particularly focusing on phases with higher pending percentages.]
+</recommendations>
+</analysis>
+
+Ensure that your analysis is based solely on the provided data and focuses on the most significant insights that can be derived from the information given.Your response should
+contain data to validate your points. give key insights of district,block and improvement potential.
+Include district ranking/score in the component, top districts, improvement potential and suggestions, blocks in the district who are performig good and bad. 
+"""
+
 def get_geotag_data(date, district=None):
     """
     Fetch geotag pending works data from the NREGS MP dashboard API
@@ -50,12 +166,14 @@ def get_geotag_data(date, district=None):
         logger.error(f"Failed to fetch geotag pending works data: {response.status_code}")
         return None
 
-def process_state_geotag_data(data):
+def process_state_geotag_data(data, target_district=None):
     """
     Process state-level geotag pending works data to extract top/bottom districts and state averages
     
     Args:
         data (dict): State-level NREGS geotag pending works data
+        target_district (str, optional): When given, only this district's rank is computed
+            (returned as "target_rank") instead of the full "district_ranks" mapping
     
     Returns:
         dict: Processed data with top/bottom districts and state averages
@@ -75,10 +193,21 @@ def process_state_geotag_data(data):
     # Sort districts by total geotag marks (highest to lowest)
     sorted_districts = sorted(data['results'], key=lambda x: x.get('geotag_marks', 0), reverse=True)
     
-    # Add rank to each district
-    district_ranks = {}
-    for i, district in enumerate(sorted_districts):
-        district_ranks[district['group_name']] = i + 1
+    # Index districts by name for direct lookups
+    by_name = {d['group_name']: d for d in data['results']}
+    
+    # Rank districts by their position in the sorted list (tied marks keep distinct ranks
+    # in list order); for a single target district only its position is looked up
+    district_ranks = None
+    target_rank = None
+    if target_district:
+        if target_district in by_name:
+            target = by_name[target_district]
+            target_rank = next(i + 1 for i, d in enumerate(sorted_districts) if d is target)
+    else:
+        district_ranks = {}
+        for i, district in enumerate(sorted_districts):
+            district_ranks[district['group_name']] = i + 1
     
     # Extract top 1 and bottom 1 districts
     top_district = sorted_districts[0]
@@ -92,9 +221,9 @@ def process_state_geotag_data(data):
     avg_pending_percentage_geotag = round(statistics.mean([d.get('pending_percentage_geotag', 0) for d in data['results']]), 2)
     avg_geotag_marks = round(statistics.mean([d.get('geotag_marks', 0) for d in data['results']]), 2)
     
-    logger.info(f"Top district: {top_district['group_name']} with geotag marks {top_district.get('geotag_marks', 0)}")
-    logger.info(f"Bottom district: {bottom_district['group_name']} with geotag marks {bottom_district.get('geotag_marks', 0)}")
-    logger.info(f"State average geotag marks: {avg_geotag_marks}")
+    logger.debug(f"Top district: {top_district['group_name']} with geotag marks {top_district.get('geotag_marks', 0)}")
+    logger.debug(f"Bottom district: {bottom_district['group_name']} with geotag marks {bottom_district.get('geotag_marks', 0)}")
+    logger.debug(f"State average geotag marks: {avg_geotag_marks}")
     
     return {
         "top_district": top_district,
@@ -108,6 +237,8 @@ def process_state_geotag_data(data):
             "geotag_marks": avg_geotag_marks
         },
         "district_ranks": district_ranks,
+        "target_rank": target_rank,
+        "by_name": by_name,
         "total_districts": len(sorted_districts)
     }
 
@@ -149,9 +280,9 @@ def process_district_geotag_data(data):
     lowest_block = sorted_blocks[-1] if sorted_blocks else None
     
     if highest_block and lowest_block:
-        logger.info(f"Highest performing block: {highest_block['group_name']} with geotag marks {highest_block.get('geotag_marks', 0)}")
-        logger.info(f"Lowest performing block: {lowest_block['group_name']} with geotag marks {lowest_block.get('geotag_marks', 0)}")
-        logger.info(f"District average geotag marks: {avg_geotag_marks}")
+        logger.debug(f"Highest performing block: {highest_block['group_name']} with geotag marks {highest_block.get('geotag_marks', 0)}")
+        logger.debug(f"Lowest performing block: {lowest_block['group_name']} with geotag marks {lowest_block.get('geotag_marks', 0)}")
+        logger.debug(f"District average geotag marks: {avg_geotag_marks}")
     
     return {
         "blocks": sorted_blocks,
@@ -170,7 +301,7 @@ def process_district_geotag_data(data):
         }
     }
 
-def generate_geotag_analysis(state_data, district_data, target_district):
+def generate_geotag_analysis(state_data, district_data, target_district, timestamp=None):
     """
     Generate analysis report using Claude 3.7 with thinking mode
     
@@ -178,89 +309,50 @@ def generate_geotag_analysis(state_data, district_data, target_district):
         state_data (dict): Processed state data
         district_data (dict): Processed district data
         target_district (str): Name of the target district
+        timestamp (str, optional): Timestamp used in output filenames
     
     Returns:
         str: Analysis report
     """
-    # Create prompt template
-    prompt = """
-You are an AI analyst tasked with evaluating the performance of districts and blocks in Madhya Pradesh, India,
-based on the National Rural Employment Guarantee Act (NREGA) data. Your goal is to provide a concise, 
-professional analysis of a target district's performance in relation to the state's top and bottom performers,
-as well as an assessment of the blocks within the target district.
-
-You will be provided with the following data:
-
-<state_data>
-{state_data}
-</state_data>
-
-<district_data>
-{district_data}
-</district_data>
-
-The target district for analysis is:
-<target_district>{target_district}</target_district>
-
-Analyze the provided data and generate a brief, professional report that includes:
-
-1. A comparison of the target district's performance to the state's top and bottom performers, highlighting strengths and weaknesses.
-2. An evaluation of the blocks within the target district, identifying high-performing and underperforming blocks.
-
-Your analysis should be precise, concise, and use professional language.
-Focus on the geotagging of works across different phases:
-
-1. Phase 0: Assets geotagging
-2. Phase 1: Before work geotagging
-3. Phase 2: During work geotagging
-4. Phase 3: After work geotagging
-
-Marks are awarded proportionately based on the percentage of works pending geotagging in each phase. Lower pending percentages indicate better performance.
-
-Present your analysis in the following format:
-
-<analysis>
-<district_performance>
-[Provide a 2-3 sentence analysis of the target district's performance compared to the top and bottom districts in the state. Highlight key strengths and weaknesses in geotagging activities.]
-</district_performance>
-
-<phase_comparison>
-[Provide a 2-3 sentence analysis comparing the district's performance across the different phases. Identify which phases are strongest and which need improvement.]
-</phase_comparison>
-
-<block_performance>
-[Provide a 2-3 sentence analysis of the blocks within the target district, identifying the highest and lowest performers and any notable trends in geotagging completion.]
-</block_performance>
-
-<recommendations>
-[Offer 1-2 concise, data-driven recommendations for improving the target district's geotagging performance, particularly focusing on phases with higher pending percentages.]
-</recommendations>
-</analysis>
-
-Ensure that your analysis is based solely on the provided data and focuses on the most significant insights that can be derived from the information given.Your response should
-contain data to validate your points. give key insights of district,block and improvement potential.
-Include district ranking/score in the component, top districts, improvement potential and suggestions, blocks in the district who are performig good and bad. 
-"""
+    # Keep only the fields the analysis needs to reduce prompt tokens
+    prompt_state_data = {
+        "top_district": _project_record(state_data["top_district"]),
+        "bottom_district": _project_record(state_data["bottom_district"]),
+        "state_averages": state_data["state_averages"]
+    }
+    prompt_district_data = {
+        "district_name": district_data["district_name"],
+        "state_rank": district_data["state_rank"],
+        "total_districts": district_data["total_districts"],
+        "district_info": _project_record(district_data["district_info"]),
+        "details": {
+            "blocks": [_project_record(block) for block in district_data["details"]["blocks"]],
+            "district_summary": district_data["details"]["district_summary"]
+        }
+    }
     
-    # Format the prompt with actual data
-    formatted_prompt = prompt.format(
-        state_data=json.dumps(state_data, indent=2),
-        district_data=json.dumps(district_data, indent=2),
-        target_district=target_district
+    # Fill in the prompt template with actual data
+    formatted_prompt = (
+        _PROMPT_TEMPLATE
+        .replace("{state_data}", json.dumps(prompt_state_data, indent=2))
+        .replace("{district_data}", json.dumps(prompt_district_data, indent=2))
+        .replace("{target_district}", target_district)
     )
     
     # Log the prompt (optional, can be disabled for production)
-    logger.debug(f"Prompt to Claude for geotag analysis:\n{formatted_prompt}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Prompt to Claude for geotag analysis:\n%s", formatted_prompt)
     
     # Call Claude 3.7 API with thinking mode
-    return call_claude_api(formatted_prompt)
+    return call_claude_api(formatted_prompt, timestamp)
 
-def call_claude_api(prompt):
+def call_claude_api(prompt, timestamp=None):
     """
     Call Claude 3.7 API with thinking mode enabled
     
     Args:
         prompt (str): Prompt to send to Claude
+        timestamp (str, optional): Timestamp used in output filenames, defaults to now
     
     Returns:
         str: Claude's response
@@ -271,12 +363,19 @@ def call_claude_api(prompt):
         logger.error(error_msg)
         raise ValueError(error_msg)
     
+    if not timestamp:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    
+    # Thinking details stay at these defaults unless the response includes them
+    thinking_output = None
+    thinking_tokens = 0
+    
     # Set model
     model = "claude-3-7-sonnet-20250219"
     logger.info(f"Using Claude model: {model} with thinking mode")
     
     try:
-        client = anthropic.Anthropic(api_key=api_key)
+        client = get_anthropic_client(api_key)
         
         # Request creation with thinking mode
         response = client.messages.create(
@@ -297,19 +396,14 @@ def call_claude_api(prompt):
         logger.info(f"Token usage - Prompt: {prompt_tokens}, Completion: {completion_tokens}, Total: {total_tokens}")
         
         # Check and log thinking output
-        thinking_output = None
         if hasattr(response, 'thinking') and response.thinking:
             thinking_text = response.thinking.thinking_text
             thinking_tokens = response.thinking.tokens
             logger.info(f"Thinking mode used: {thinking_tokens} tokens")
             
-            # Create output directory if it doesn't exist
-            os.makedirs("output", exist_ok=True)
-            
             # Save thinking to file
-            thinking_file = os.path.join("output", f"geotag_thinking_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
-            with open(thinking_file, 'w', encoding='utf-8') as f:
-                f.write(thinking_text)
+            thinking_file = os.path.join("output", f"geotag_thinking_{timestamp}.txt")
+            write_output_file(thinking_file, thinking_text)
             logger.info(f"Thinking output saved to {thinking_file}")
             
             thinking_output = thinking_text
@@ -317,29 +411,22 @@ def call_claude_api(prompt):
             logger.info("No thinking output received")
         
         # Extract the actual response text
-        response_text = ""
-        for content_block in response.content:
-            if hasattr(content_block, 'text'):
-                response_text += content_block.text
-        
-        # Create output directory if it doesn't exist
-        os.makedirs("output", exist_ok=True)
+        response_text = "".join(getattr(content_block, 'text', '') for content_block in response.content)
         
         # Save full response to file
-        response_file = os.path.join("output", f"geotag_claude_response_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-        with open(response_file, 'w', encoding='utf-8') as f:
-            response_data = {
-                "model": model,
-                "response_text": response_text,
-                "thinking_text": thinking_output,
-                "token_usage": {
-                    "prompt_tokens": prompt_tokens,
-                    "completion_tokens": completion_tokens,
-                    "total_tokens": total_tokens,
-                    "thinking_tokens": thinking_tokens if hasattr(response, 'thinking') and response.thinking else 0
-                }
+        response_file = os.path.join("output", f"geotag_claude_response_{timestamp}.json")
+        response_data = {
+            "model": model,
+            "response_text": response_text,
+            "thinking_text": thinking_output,
+            "token_usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": total_tokens,
+                "thinking_tokens": thinking_tokens
             }
-            json.dump(response_data, f, indent=2)
+        }
+        write_output_file(response_file, json.dumps(response_data, separators=(',', ':')))
         
         logger.info(f"Full response data saved to {response_file}")
         
@@ -349,7 +436,37 @@ def call_claude_api(prompt):
         logger.error(f"Error calling Claude API: {str(e)}")
         raise
 
-def main(date=None, district=None, output_format="text"):
+def format_geotag_summary(result):
+    """
+    Build a plain-text summary of the processed geotag data without calling Claude
+    
+    Args:
+        result (dict): Result dict assembled by main with state and district data
+    
+    Returns:
+        str: Summary report
+    """
+    state_data = result["state_data"]
+    district_data = result["district_data"]
+    summary = district_data["details"]["district_summary"]
+    district_info = district_data["district_info"] or {}
+    
+    lines = [
+        f"Geotag pending works summary for {district_data['district_name']} ({result['date']})",
+        f"State rank: {district_data['state_rank']} of {district_data['total_districts']}",
+        f"District geotag marks: {district_info.get('geotag_marks', 'N/A')} "
+        f"(state average: {state_data['state_averages']['geotag_marks']})",
+        f"Top district: {state_data['top_district']['group_name']} "
+        f"({state_data['top_district'].get('geotag_marks', 0)})",
+        f"Bottom district: {state_data['bottom_district']['group_name']} "
+        f"({state_data['bottom_district'].get('geotag_marks', 0)})",
+        f"Highest performing block: {summary['highest_performing_block']} ({summary['highest_geotag_marks']})",
+        f"Lowest performing block: {summary['lowest_performing_block']} ({summary['lowest_geotag_marks']})",
+        f"Average block geotag marks: {summary['average_geotag_marks']}"
+    ]
+    return "\n".join(lines)
+
+def main(date=None, district=None, output_format="text", skip_analysis=False):
     """
     Main function to fetch and process NREGS geotag pending works data, then analyze it
     
@@ -357,15 +474,20 @@ def main(date=None, district=None, output_format="text"):
         date (str, optional): Date in YYYY-MM-DD format
         district (str, optional): District name for specific data
         output_format (str, optional): Output format ('text' or 'json')
+        skip_analysis (bool, optional): Return a locally built summary instead of calling Claude
     
     Returns:
         Union[str, dict]: Analysis result in specified format
     """
     logger.info(f"Starting NREGS geotag analysis for district: {district}, date: {date if date else 'current'}")
     
+    # Timestamp shared by all output files of this run
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
+    
     # Use current date if none provided
     if not date:
-        date = datetime.now().strftime("%Y-%m-%d")
+        date = now.strftime("%Y-%m-%d")
         logger.info(f"Using current date: {date}")
     
     # Get state-level data
@@ -375,7 +497,7 @@ def main(date=None, district=None, output_format="text"):
         logger.error("Failed to get state-level geotag data")
         return None
     
-    processed_state_data = process_state_geotag_data(state_data)
+    processed_state_data = process_state_geotag_data(state_data, district)
     if not processed_state_data:
         logger.error("Failed to process state-level geotag data")
         return None
@@ -395,6 +517,13 @@ def main(date=None, district=None, output_format="text"):
         logger.error(error_msg)
         return error_msg
     
+    # Skip the district fetch, the summary and the Claude call for names the state data doesn't know
+    if district not in processed_state_data["by_name"]:
+        error_msg = f"Unknown district: {district}"
+        logger.error(error_msg)
+        # JSON callers read .get("analysis") from the result, so only text mode gets the message
+        return error_msg if output_format == "text" else None
+    
     # Get district-level data
     logger.info(f"Fetching geotag data for district: {district}")
     district_data = get_geotag_data(date, district)
@@ -408,15 +537,11 @@ def main(date=None, district=None, output_format="text"):
         return None
     
     # Get district rank
-    district_rank = processed_state_data["district_ranks"].get(district, None)
+    district_rank = processed_state_data["target_rank"]
     total_districts = processed_state_data["total_districts"]
     
-    # Find the district data in the state data for complete information
-    target_district_data = None
-    for d in state_data['results']:
-        if d['group_name'] == district:
-            target_district_data = d
-            break
+    # Look up the district data in the state data for complete information
+    target_district_data = processed_state_data["by_name"].get(district)
     
     result["district_data"] = {
         "district_name": district,
@@ -426,33 +551,38 @@ def main(date=None, district=None, output_format="text"):
         "details": processed_district_data
     }
     
-    # Generate analysis using Claude
-    logger.info("Generating geotag analysis using Claude 3.7")
-    analysis = generate_geotag_analysis(
-        result["state_data"], 
-        result["district_data"], 
-        district
-    )
+    # Fall back to the local summary when Claude cannot be called
+    if not skip_analysis and not os.getenv("ANTHROPIC_API_KEY"):
+        logger.warning("ANTHROPIC_API_KEY environment variable not set, skipping Claude analysis")
+        skip_analysis = True
     
-    # Create output directory if it doesn't exist
-    os.makedirs("output", exist_ok=True)
+    if skip_analysis:
+        logger.info("Skipping Claude analysis, building geotag summary locally")
+        analysis = format_geotag_summary(result)
+    else:
+        # Generate analysis using Claude
+        logger.info("Generating geotag analysis using Claude 3.7")
+        analysis = generate_geotag_analysis(
+            result["state_data"], 
+            result["district_data"], 
+            district,
+            timestamp
+        )
     
     # Create output based on requested format
     if output_format == "json":
         result["analysis"] = analysis
         
         # Save output to file
-        filename = os.path.join("output", f"nregs_geotag_analysis_{district.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=4)
+        filename = os.path.join("output", f"nregs_geotag_analysis_{district.lower()}_{timestamp}.json")
+        write_output_file(filename, json.dumps(result, separators=(',', ':')))
         logger.info(f"Analysis saved to {filename}")
         
         return result
     else:
         # Save output to file
-        filename = os.path.join("output", f"nregs_geotag_analysis_{district.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(analysis)
+        filename = os.path.join("output", f"nregs_geotag_analysis_{district.lower()}_{timestamp}.txt")
+        write_output_file(filename, analysis)
         logger.info(f"Analysis saved to {filename}")
         
         return analysis
@@ -465,11 +595,13 @@ if __name__ == "__main__":
     parser.add_argument('--district', type=str, required=True, help='District name')
     parser.add_argument('--output', type=str, default="text", choices=["text", "json"],
                         help='Output format (text or json)')
+    parser.add_argument('--no-analysis', action='store_true',
+                        help='Skip the Claude analysis and output only the data summary')
     
     args = parser.parse_args()
     
     try:
-        result = main(args.date, args.district, args.output)
+        result = main(args.date, args.district, args.output, args.no_analysis)
         
         if args.output == "json":
             print(json.dumps(result, indent=4))
@@ -1,8 +1,14 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-import statistics
 import os
+import re
+import atexit
 import logging
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, Optional
 import anthropic
@@ -22,6 +28,139 @@ logger = logging.getLogger(__name__)
 # Load environment variables from .env file
 load_dotenv()
 
+# HTTP session shared by all dashboard API requests (keep-alive + connection pooling)
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=frozenset(['GET']),
+        # Hand back the last response once retries are exhausted so its status gets logged
+        raise_on_status=False
+    )
+))
+SESSION.headers.update({"Accept-Encoding": "gzip"})
+
+# Anthropic client shared by all Claude calls (including batch threads), created on first use
+_anthropic_client: Optional[anthropic.Anthropic] = None
+_anthropic_client_lock = threading.Lock()
+
+def get_anthropic_client(api_key):
+    """
+    Return the module-level Anthropic client, creating it on first use
+    
+    Args:
+        api_key (str): Anthropic API key
+    
+    Returns:
+        anthropic.Anthropic: Shared client
+    """
+    global _anthropic_client
+    with _anthropic_client_lock:
+        if _anthropic_client is None:
+            # HTTP/2 lets concurrent batch calls share one multiplexed connection
+            _anthropic_client = anthropic.Anthropic(
+                api_key=api_key,
+                max_retries=2,
+                http_client=anthropic.DefaultHttpxClient(http2=True)
+            )
+    return _anthropic_client
+
+# Cap on Claude calls in flight at once (batch runs analyze districts in parallel threads)
+MAX_CONCURRENT_CLAUDE_CALLS = 5
+_claude_semaphore = threading.BoundedSemaphore(MAX_CONCURRENT_CLAUDE_CALLS)
+
+# Background pool for writing Claude output dumps without blocking the caller
+_IO_POOL = ThreadPoolExecutor(max_workers=2)
+atexit.register(_IO_POOL.shutdown, wait=True)
+
+def _write_file(path, content, description):
+    """Write text to a file and log where it was saved (runs on _IO_POOL)"""
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        logger.info(f"{description} saved to {path}")
+    except OSError as e:
+        logger.error(f"Failed to save {description.lower()} to {path}: {str(e)}")
+
+# Prompt template for the labour engagement analysis, filled in by generate_analysis
+_PROMPT_TEMPLATE = """
+You are an AI analyst tasked with evaluating the performance of districts and blocks in Madhya Pradesh, India,
+based on the National Rural Employment Guarantee Act (NREGA) data. Your goal is to provide a concise, 
+professional analysis of a target district's performance in relation to the state's top and bottom performers,
+ as well as an assessment of the blocks within the target district.
+
+You will be provided with the following data:
+
+<state_data>
+{state_data}
+</state_data>
+
+<district_data>
+{district_data}
+</district_data>
+
+The target district for analysis is:
+<target_district>{target_district}</target_district>
+
+Analyze the provided data and generate a brief, professional report that includes:
+
+1. A comparison of the target district's performance to the state's top and bottom performers, highlighting strengths and weaknesses.
+2. An evaluation of the blocks within the target district, identifying high-performing and underperforming blocks.
+
+Your analysis should be precise, concise, and use professional language.
+ Focus on the "Employment provided to workers" metric, which is represented by the "ratio" value in the data (percentage of registered workers engaged in labor).
+The maximum score for this metric is 15 marks.
+
+Present your analysis in the following format:
+
+<analysis>
+<district_performance>
+[Provide a 3-4 sentence analysis of the target district's performance compared to the top and bottom districts in the state. Highlight key strengths and weaknesses.]
+</district_performance>
+
+<block_performance>
+[Provide a 2-3 sentence analysis of the blocks within the target district, identifying the highest and lowest performers and any notable trends.]
+</block_performance>
+
+<recommendations>
+[Offer 2-3 concise, data-driven recommendations for improving the target district's performance. Note that our endevour is
+to maximise labor participation and our recommendations should include this urgency]
+</recommendations>
+</analysis>
+
+Ensure that your analysis is based solely on the provided data and focuses on the most significant insights that can be derived from the information given.
+Your response should contain data to validate your points. give key insights of district,block and improvement potential.
+Include district ranking/score in the component, top districts, improvement potential and suggestions, blocks in the district who are performig good and bad. 
+"""
+
+# Sections the prompt asks Claude to return inside <analysis>, compiled once
+_ANALYSIS_SECTIONS = ("district_performance", "block_performance", "recommendations")
+_SECTION_RES = {name: re.compile(fr'<{name}>(.*?)</{name}>', re.S) for name in _ANALYSIS_SECTIONS}
+
+@functools.lru_cache(maxsize=256)
+def _fetch_response_body(url):
+    """
+    Fetch the raw response body for a dashboard API URL, cached per URL
+    
+    Args:
+        url (str): Full API URL
+    
+    Returns:
+        bytes: Response body
+    
+    Raises:
+        requests.HTTPError: If the response status is not 200 (failures are not cached)
+    """
+    response = SESSION.get(url, timeout=(3.05, 30))
+    if response.status_code != 200:
+        raise requests.HTTPError(f"Unexpected status code {response.status_code}", response=response)
+    # Raw bytes avoid requests' charset detection; json.loads decodes UTF-8 bytes directly
+    return response.content
+
 def get_nregs_data(date, district=None):
     """
     Fetch data from the NREGS MP dashboard API
@@ -41,21 +180,57 @@ def get_nregs_data(date, district=None):
         url = f"{base_url}?date={date}"
     
     logger.info(f"Fetching data from: {url}")
-    response = requests.get(url)
-    
-    if response.status_code == 200:
-        logger.info(f"Successfully fetched data from: {url}")
-        return response.json()
-    else:
-        logger.error(f"Failed to fetch data: {response.status_code}")
+    try:
+        response_body = _fetch_response_body(url)
+    except requests.HTTPError as e:
+        logger.error(f"Failed to fetch data: {e.response.status_code}")
+        return None
+    except requests.RequestException as e:
+        logger.error(f"Failed to fetch data after retries: {str(e)}")
         return None
+    
+    # Parse on every call so callers get their own copy (the processors modify it in place)
+    logger.info(f"Successfully fetched data from: {url}")
+    return json.loads(response_body)
+
+def _format_and_sum_records(records):
+    """
+    Format district/block records in place and total their metrics in a single pass
+    
+    Ratios are converted to percentages and all values are rounded to 2 decimal places.
+    
+    Args:
+        records (list): District or block records from the API
+    
+    Returns:
+        tuple: Sums of ratio, total_registered_workers, 30_day_avg_labour_expected and marks
+    """
+    sum_ratio = 0
+    sum_registered_workers = 0
+    sum_labour_expected = 0
+    sum_marks = 0
+    for record in records:
+        ratio = round(record['ratio'] * 100, 2)
+        marks = round(record['marks'], 2)
+        labour_expected = round(record['30_day_avg_labour_expected'], 2)
+        record['ratio'] = ratio
+        record['marks'] = marks
+        record['30_day_avg_labour_expected'] = labour_expected
+        
+        sum_ratio += ratio
+        sum_registered_workers += record['total_registered_workers']
+        sum_labour_expected += labour_expected
+        sum_marks += marks
+    return sum_ratio, sum_registered_workers, sum_labour_expected, sum_marks
 
-def process_state_data(data):
+def process_state_data(data, target_district=None):
     """
     Process state-level data to extract top 1 and bottom 1 districts and state average
     
     Args:
         data (dict): State-level NREGS data
+        target_district (str, optional): When given, only this district's rank is computed
+            (returned as "target_rank") instead of the full "district_ranks" mapping
     
     Returns:
         dict: Processed data with top/bottom districts and state average
@@ -66,32 +241,46 @@ def process_state_data(data):
     
     logger.info(f"Processing state data with {len(data['results'])} districts")
     
-    # Format all data points to have 2 decimal places and convert ratios to percentages
-    for district in data['results']:
-        district['ratio'] = round(district['ratio'] * 100, 2)
-        district['marks'] = round(district['marks'], 2)
-        district['30_day_avg_labour_expected'] = round(district['30_day_avg_labour_expected'], 2)
-    
-    # Sort districts by ratio (highest to lowest)
-    sorted_districts = sorted(data['results'], key=lambda x: x['ratio'], reverse=True)
-    
-    # Add rank to each district (for finding specific district rank later)
-    district_ranks = {}
-    for i, district in enumerate(sorted_districts):
-        district_ranks[district['group_name']] = i + 1
-    
-    # Extract top 1 and bottom 1 districts
-    top_district = sorted_districts[0]
-    bottom_district = sorted_districts[-1]
+    # Format all data points and total them for the state averages
+    sum_ratio, sum_registered_workers, sum_labour_expected, sum_marks = _format_and_sum_records(data['results'])
+    num_districts = len(data['results'])
+    
+    # Index districts by name once so per-district lookups don't rescan the results
+    by_name = {district['group_name']: district for district in data['results']}
+    
+    # Extract top 1 and bottom 1 districts by ratio with a linear scan
+    # (on ties, the same districts a stable descending sort would pick)
+    top_district = max(data['results'], key=lambda x: x['ratio'])
+    bottom_district = min(reversed(data['results']), key=lambda x: x['ratio'])
+    
+    # Rank districts by ratio; for a single target district count its position in a
+    # stable descending sort (higher ratios, plus equal ratios listed before it) instead of sorting
+    district_ranks = None
+    target_rank = None
+    if target_district:
+        if target_district in by_name:
+            target = by_name[target_district]
+            target_ratio = target['ratio']
+            target_rank = 1
+            before_target = True
+            for d in data['results']:
+                if d is target:
+                    before_target = False
+                elif d['ratio'] > target_ratio or (before_target and d['ratio'] == target_ratio):
+                    target_rank += 1
+    else:
+        sorted_districts = sorted(data['results'], key=lambda x: x['ratio'], reverse=True)
+        district_ranks = {}
+        for i, district in enumerate(sorted_districts):
+            district_ranks[district['group_name']] = i + 1
     
     # Calculate state average
-    all_ratios = [district['ratio'] for district in data['results']]
-    state_avg_ratio = round(statistics.mean(all_ratios), 2)
+    state_avg_ratio = round(sum_ratio / num_districts, 2)
     
     # Calculate other averages
-    avg_registered_workers = round(statistics.mean([district['total_registered_workers'] for district in data['results']]), 2)
-    avg_labour_expected = round(statistics.mean([district['30_day_avg_labour_expected'] for district in data['results']]), 2)
-    avg_marks = round(statistics.mean([district['marks'] for district in data['results']]), 2)
+    avg_registered_workers = round(sum_registered_workers / num_districts, 2)
+    avg_labour_expected = round(sum_labour_expected / num_districts, 2)
+    avg_marks = round(sum_marks / num_districts, 2)
     
     logger.info(f"Top district: {top_district['group_name']} with ratio {top_district['ratio']}%")
     logger.info(f"Bottom district: {bottom_district['group_name']} with ratio {bottom_district['ratio']}%")
@@ -107,7 +296,9 @@ def process_state_data(data):
             "marks": avg_marks
         },
         "district_ranks": district_ranks,
-        "total_districts": len(sorted_districts)
+        "target_rank": target_rank,
+        "by_name": by_name,
+        "total_districts": num_districts
     }
 
 def process_district_data(data):
@@ -126,21 +317,15 @@ def process_district_data(data):
     
     logger.info(f"Processing district data with {len(data['results'])} blocks")
     
-    # Format all data points to have 2 decimal places and convert ratios to percentages
-    for block in data['results']:
-        block['ratio'] = round(block['ratio'] * 100, 2)
-        block['marks'] = round(block['marks'], 2)
-        block['30_day_avg_labour_expected'] = round(block['30_day_avg_labour_expected'], 2)
+    # Format all data points and total them for the district summary
+    sum_ratio, total_registered_workers, total_labour_expected, _ = _format_and_sum_records(data['results'])
     
     # Sort blocks by ratio (highest to lowest)
     sorted_blocks = sorted(data['results'], key=lambda x: x['ratio'], reverse=True)
     
     # Calculate district averages
-    block_ratios = [block['ratio'] for block in data['results']]
-    avg_ratio = round(statistics.mean(block_ratios), 2)
-    
-    total_registered_workers = sum([block['total_registered_workers'] for block in data['results']])
-    total_labour_expected = round(sum([block['30_day_avg_labour_expected'] for block in data['results']]), 2)
+    avg_ratio = round(sum_ratio / len(data['results']), 2)
+    total_labour_expected = round(total_labour_expected, 2)
     
     # Get highest and lowest performing blocks
     highest_block = sorted_blocks[0]
@@ -164,7 +349,20 @@ def process_district_data(data):
         }
     }
 
-def generate_analysis(state_data, district_data, target_district):
+# Fields of a district/block record that the analysis prompt actually uses
+_PROMPT_RECORD_FIELDS = ('group_name', 'ratio', 'marks')
+
+def _project_record(record):
+    """Copy only the prompt fields of a district/block record"""
+    if not record:
+        return record
+    return {key: record[key] for key in _PROMPT_RECORD_FIELDS if key in record}
+
+def _prompt_json(obj):
+    """Serialize data for the Claude prompt as compact JSON (indentation only adds tokens)"""
+    return json.dumps(obj, separators=(',', ':'))
+
+def generate_analysis(state_data, district_data, target_district, timestamp=None):
     """
     Generate analysis report using Claude 3.7 with thinking mode
     
@@ -172,80 +370,66 @@ def generate_analysis(state_data, district_data, target_district):
         state_data (dict): Processed state data
         district_data (dict): Processed district data
         target_district (str): Name of the target district
+        timestamp (str, optional): Run timestamp used in output filenames
     
     Returns:
         str: Analysis report
     """
-    # Create prompt template
-    prompt = """
-You are an AI analyst tasked with evaluating the performance of districts and blocks in Madhya Pradesh, India,
-based on the National Rural Employment Guarantee Act (NREGA) data. Your goal is to provide a concise, 
-professional analysis of a target district's performance in relation to the state's top and bottom performers,
- as well as an assessment of the blocks within the target district.
-
-You will be provided with the following data:
-
-<state_data>
-{state_data}
-</state_data>
-
-<district_data>
-{district_data}
-</district_data>
-
-The target district for analysis is:
-<target_district>{target_district}</target_district>
-
-Analyze the provided data and generate a brief, professional report that includes:
-
-1. A comparison of the target district's performance to the state's top and bottom performers, highlighting strengths and weaknesses.
-2. An evaluation of the blocks within the target district, identifying high-performing and underperforming blocks.
-
-Your analysis should be precise, concise, and use professional language.
- Focus on the "Employment provided to workers" metric, which is represented by the "ratio" value in the data (percentage of registered workers engaged in labor).
-The maximum score for this metric is 15 marks.
-
-Present your analysis in the following format:
-
-<analysis>
-<district_performance>
-[Provide a 3-4 sentence analysis of the target district's performance compared to the top and bottom districts in the state. Highlight key strengths and weaknesses.]
-</district_performance>
-
-<block_performance>
-[Provide a 2-3 sentence analysis of the blocks within the target district, identifying the highest and lowest performers and any notable trends.]
-</block_performance>
-
-<recommendations>
-[Offer 2-3 concise, data-driven recommendations for improving the target district's performance. Note that our endevour is
-to maximise labor participation and our recommendations should include this urgency]
-</recommendations>
-</analysis>
-
-Ensure that your analysis is based solely on the provided data and focuses on the most significant insights that can be derived from the information given.
-Your response should contain data to validate your points. give key insights of district,block and improvement potential.
-Include district ranking/score in the component, top districts, improvement potential and suggestions, blocks in the district who are performig good and bad. 
-"""
+    # Keep only the fields the analysis needs to reduce prompt tokens
+    prompt_state_data = {
+        "top_district": _project_record(state_data["top_district"]),
+        "bottom_district": _project_record(state_data["bottom_district"]),
+        "state_averages": state_data["state_averages"]
+    }
+    prompt_district_data = {
+        "district_name": district_data["district_name"],
+        "state_rank": district_data["state_rank"],
+        "total_districts": district_data["total_districts"],
+        "district_info": _project_record(district_data["district_info"]),
+        "details": {
+            "blocks": [_project_record(block) for block in district_data["details"]["blocks"]],
+            "district_summary": district_data["details"]["district_summary"]
+        }
+    }
     
-    # Format the prompt with actual data
-    formatted_prompt = prompt.format(
-        state_data=json.dumps(state_data, indent=2),
-        district_data=json.dumps(district_data, indent=2),
-        target_district=target_district
+    # Fill in the prompt template with actual data
+    formatted_prompt = (
+        _PROMPT_TEMPLATE
+        .replace("{state_data}", _prompt_json(prompt_state_data))
+        .replace("{district_data}", _prompt_json(prompt_district_data))
+        .replace("{target_district}", target_district)
     )
     
     # Log the prompt (optional, can be disabled for production)
     logger.debug(f"Prompt to Claude:\n{formatted_prompt}")
     
     # Call Claude 3.7 API with thinking mode
-    return call_claude_api(formatted_prompt)
+    return call_claude_api(formatted_prompt, timestamp, target_district)
+
+def parse_analysis(text):
+    """
+    Extract the tagged sections from a Claude analysis response
+    
+    Args:
+        text (str): Analysis text returned by generate_analysis
+    
+    Returns:
+        dict: Section name mapped to its stripped text (None if the section is missing)
+    """
+    sections = {}
+    for name, pattern in _SECTION_RES.items():
+        match = pattern.search(text or "")
+        sections[name] = match.group(1).strip() if match else None
+    return sections
 
-def call_claude_api(prompt):
+def call_claude_api(prompt, timestamp=None, district=None):
     """
     Call Claude 3.7 API with thinking mode enabled
     
     Args:
         prompt (str): Prompt to send to Claude
+        timestamp (str, optional): Run timestamp used in output filenames, defaults to now
+        district (str, optional): District name added to output filenames so batch runs don't collide
     
     Returns:
         str: Claude's response
@@ -256,15 +440,20 @@ def call_claude_api(prompt):
         logger.error(error_msg)
         raise ValueError(error_msg)
     
+    if not timestamp:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    file_suffix = f"{district.lower()}_{timestamp}" if district else timestamp
+    
     # Set model
     model = "claude-3-7-sonnet-20250219"
     logger.info(f"Using Claude model: {model} with thinking mode")
     
     try:
-        client = anthropic.Anthropic(api_key=api_key)
+        client = get_anthropic_client(api_key)
         
-        # Request creation with thinking mode
-        response = client.messages.create(
+        # Stream the response with thinking mode, collecting text as it arrives
+        text_chunks = []
+        with _claude_semaphore, client.messages.stream(
             model=model,
             max_tokens=20000,
             thinking={
@@ -272,7 +461,10 @@ def call_claude_api(prompt):
                 "budget_tokens": 16000
             },
             messages=[{"role": "user", "content": prompt}]
-        )
+        ) as stream:
+            for text in stream.text_stream:
+                text_chunks.append(text)
+            response = stream.get_final_message()
         
         # Log token usage
         prompt_tokens = response.usage.input_tokens
@@ -281,46 +473,33 @@ def call_claude_api(prompt):
         
         logger.info(f"Token usage - Prompt: {prompt_tokens}, Completion: {completion_tokens}, Total: {total_tokens}")
         
-        # Check and log thinking output
-        thinking_output = None
-        if hasattr(response, 'thinking') and response.thinking:
-            thinking_text = response.thinking.thinking_text
-            thinking_tokens = response.thinking.tokens
-            logger.info(f"Thinking mode used: {thinking_tokens} tokens")
+        # Thinking arrives as "thinking" content blocks of the final message
+        thinking_output = "".join(block.thinking for block in response.content if block.type == "thinking") or None
+        if thinking_output:
+            logger.info(f"Thinking mode used: {len(thinking_output)} characters of thinking")
             
             # Save thinking to file
-            thinking_file = f"thinking_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-            with open(thinking_file, 'w', encoding='utf-8') as f:
-                f.write(thinking_text)
-            logger.info(f"Thinking output saved to {thinking_file}")
-            
-            thinking_output = thinking_text
+            thinking_file = f"thinking_{file_suffix}.txt"
+            _IO_POOL.submit(_write_file, thinking_file, thinking_output, "Thinking output")
         else:
             logger.info("No thinking output received")
         
-        # Extract the actual response text
-        response_text = ""
-        for content_block in response.content:
-            if hasattr(content_block, 'text'):
-                response_text += content_block.text
+        # Assemble the response text from the streamed chunks
+        response_text = "".join(text_chunks)
         
         # Save full response to file
-        response_file = f"claude_response_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(response_file, 'w', encoding='utf-8') as f:
-            response_data = {
-                "model": model,
-                "response_text": response_text,
-                "thinking_text": thinking_output,
-                "token_usage": {
-                    "prompt_tokens": prompt_tokens,
-                    "completion_tokens": completion_tokens,
-                    "total_tokens": total_tokens,
-                    "thinking_tokens": thinking_tokens if hasattr(response, 'thinking') and response.thinking else 0
-                }
+        response_file = f"claude_response_{file_suffix}.json"
+        response_data = {
+            "model": model,
+            "response_text": response_text,
+            "thinking_text": thinking_output,
+            "token_usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": total_tokens
             }
-            json.dump(response_data, f, indent=2)
-        
-        logger.info(f"Full response data saved to {response_file}")
+        }
+        _IO_POOL.submit(_write_file, response_file, json.dumps(response_data, indent=2), "Full response data")
         
         return response_text
     
@@ -328,37 +507,22 @@ def call_claude_api(prompt):
         logger.error(f"Error calling Claude API: {str(e)}")
         raise
 
-def main(date=None, district=None, output_format="text"):
+def _analyze_district(date, district, state_data, processed_state_data, output_format, timestamp, district_data=None):
     """
-    Main function to fetch and process NREGS data, then analyze it
+    Process one district against already processed state data, analyze it and save the output
     
     Args:
-        date (str, optional): Date in YYYY-MM-DD format
-        district (str, optional): District name for specific data
-        output_format (str, optional): Output format ('text' or 'json')
+        date (str): Date in YYYY-MM-DD format
+        district (str): District name
+        state_data (dict): Raw state-level NREGS data (already formatted by process_state_data)
+        processed_state_data (dict): Output of process_state_data
+        output_format (str): Output format ('text' or 'json')
+        timestamp (str): Run timestamp used in output filenames
+        district_data (dict, optional): District-level NREGS data, fetched if not given
     
     Returns:
         Union[str, dict]: Analysis result in specified format
     """
-    logger.info(f"Starting NREGS analysis for district: {district}, date: {date if date else 'current'}")
-    
-    # Use current date if none provided
-    if not date:
-        date = datetime.now().strftime("%Y-%m-%d")
-        logger.info(f"Using current date: {date}")
-    
-    # Get state-level data
-    logger.info("Fetching state-level data")
-    state_data = get_nregs_data(date)
-    if not state_data:
-        logger.error("Failed to get state-level data")
-        return None
-    
-    processed_state_data = process_state_data(state_data)
-    if not processed_state_data:
-        logger.error("Failed to process state-level data")
-        return None
-    
     result = {
         "date": date,
         "max_district_ratio": round(state_data.get("max_district_ratio", 0) * 100, 2),
@@ -369,15 +533,10 @@ def main(date=None, district=None, output_format="text"):
         }
     }
     
-    # Check if district is provided
-    if not district:
-        error_msg = "District name is required for analysis"
-        logger.error(error_msg)
-        return error_msg
-    
-    # Get district-level data
-    logger.info(f"Fetching data for district: {district}")
-    district_data = get_nregs_data(date, district)
+    # Get district-level data unless it was fetched by the caller
+    if district_data is None:
+        logger.info(f"Fetching data for district: {district}")
+        district_data = get_nregs_data(date, district)
     if not district_data:
         logger.error(f"Failed to get data for district: {district}")
         return None
@@ -387,16 +546,15 @@ def main(date=None, district=None, output_format="text"):
         logger.error(f"Failed to process data for district: {district}")
         return None
     
-    # Get district rank
-    district_rank = processed_state_data["district_ranks"].get(district, None)
+    # Get district rank (a full ranking is only built when no target district was given)
+    if processed_state_data["district_ranks"] is not None:
+        district_rank = processed_state_data["district_ranks"].get(district, None)
+    else:
+        district_rank = processed_state_data["target_rank"]
     total_districts = processed_state_data["total_districts"]
     
-    # Find the district data in the state data for complete information
-    target_district_data = None
-    for d in state_data['results']:
-        if d['group_name'] == district:
-            target_district_data = d
-            break
+    # Look up the district data in the state data for complete information
+    target_district_data = processed_state_data["by_name"].get(district)
     
     result["district_data"] = {
         "district_name": district,
@@ -407,11 +565,12 @@ def main(date=None, district=None, output_format="text"):
     }
     
     # Generate analysis using Claude
-    logger.info("Generating analysis using Claude 3.7")
+    logger.info(f"Generating analysis for {district} using Claude 3.7")
     analysis = generate_analysis(
         result["state_data"], 
         result["district_data"], 
-        district
+        district,
+        timestamp
     )
     
     # Create output based on requested format
@@ -419,39 +578,152 @@ def main(date=None, district=None, output_format="text"):
         result["analysis"] = analysis
         
         # Save output to file
-        filename = f"nregs_analysis_{district.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        filename = f"nregs_analysis_{district.lower()}_{timestamp}.json"
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=4)
+            f.write(json.dumps(result, indent=4))
         logger.info(f"Analysis saved to {filename}")
         
         return result
     else:
         # Save output to file
-        filename = f"nregs_analysis_{district.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        filename = f"nregs_analysis_{district.lower()}_{timestamp}.txt"
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(analysis)
         logger.info(f"Analysis saved to {filename}")
         
         return analysis
 
+def main(date=None, district=None, output_format="text"):
+    """
+    Main function to fetch and process NREGS data, then analyze it
+    
+    Args:
+        date (str, optional): Date in YYYY-MM-DD format
+        district (str, optional): District name for specific data
+        output_format (str, optional): Output format ('text' or 'json')
+    
+    Returns:
+        Union[str, dict]: Analysis result in specified format
+    """
+    logger.info(f"Starting NREGS analysis for district: {district}, date: {date if date else 'current'}")
+    
+    # Timestamp shared by all output files of this run
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
+    
+    # Use current date if none provided
+    if not date:
+        date = now.strftime("%Y-%m-%d")
+        logger.info(f"Using current date: {date}")
+    
+    # Fetch state-level and district-level data concurrently
+    logger.info("Fetching state-level and district-level data")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        state_future = executor.submit(get_nregs_data, date)
+        district_future = executor.submit(get_nregs_data, date, district) if district else None
+        state_data = state_future.result()
+        district_data = district_future.result() if district_future else None
+    
+    if not state_data:
+        logger.error("Failed to get state-level data")
+        return None
+    
+    processed_state_data = process_state_data(state_data, district)
+    if not processed_state_data:
+        logger.error("Failed to process state-level data")
+        return None
+    
+    # Check if district is provided
+    if not district:
+        error_msg = "District name is required for analysis"
+        logger.error(error_msg)
+        return error_msg
+    
+    # Check district-level data
+    if not district_data:
+        logger.error(f"Failed to get data for district: {district}")
+        return None
+    
+    return _analyze_district(date, district, state_data, processed_state_data, output_format, timestamp, district_data)
+
+def analyze_districts(date=None, districts=None, output_format="text", max_workers=8):
+    """
+    Analyze several districts in one run, fetching and processing the state-level data only once
+    
+    Districts are fetched and analyzed concurrently, with at most max_workers in flight.
+    
+    Args:
+        date (str, optional): Date in YYYY-MM-DD format
+        districts (list): District names to analyze
+        output_format (str, optional): Output format ('text' or 'json')
+        max_workers (int, optional): Maximum number of districts processed at the same time
+    
+    Returns:
+        dict: District name mapped to its analysis result in specified format (None on failure)
+    """
+    logger.info(f"Starting NREGS analysis for {len(districts or [])} districts, date: {date if date else 'current'}")
+    
+    if not districts:
+        logger.error("At least one district name is required for analysis")
+        return {}
+    
+    # Timestamp shared by all output files of this run
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
+    
+    # Use current date if none provided
+    if not date:
+        date = now.strftime("%Y-%m-%d")
+        logger.info(f"Using current date: {date}")
+    
+    # Get and process state-level data once for all districts
+    logger.info("Fetching state-level data")
+    state_data = get_nregs_data(date)
+    if not state_data:
+        logger.error("Failed to get state-level data")
+        return {district: None for district in districts}
+    
+    processed_state_data = process_state_data(state_data)
+    if not processed_state_data:
+        logger.error("Failed to process state-level data")
+        return {district: None for district in districts}
+    
+    def analyze_one(district):
+        try:
+            return _analyze_district(date, district, state_data, processed_state_data, output_format, timestamp)
+        except Exception as e:
+            logger.error(f"Error analyzing district {district}: {str(e)}")
+            return None
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(districts, executor.map(analyze_one, districts)))
+
 if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description='NREGS Data Analysis')
     parser.add_argument('--date', type=str, help='Date in YYYY-MM-DD format')
-    parser.add_argument('--district', type=str, required=True, help='District name')
+    parser.add_argument('--district', type=str, nargs='+', required=True,
+                        help='District name (several names analyze the districts in one batch)')
     parser.add_argument('--output', type=str, default="text", choices=["text", "json"],
                         help='Output format (text or json)')
     
     args = parser.parse_args()
     
     try:
-        result = main(args.date, args.district, args.output)
+        if len(args.district) == 1:
+            result = main(args.date, args.district[0], args.output)
+        else:
+            result = analyze_districts(args.date, args.district, args.output)
         
         if args.output == "json":
             print(json.dumps(result, indent=4))
-        else:
+        elif len(args.district) == 1:
             print(result)
+        else:
+            for name, analysis in result.items():
+                print(f"===== {name} =====")
+                print(analysis)
     except Exception as e:
         logger.error(f"Error in main execution: {str(e)}")
         print(f"Error: {str(e)}")
@@ -1,8 +1,14 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-import statistics
+import hashlib
 import os
+import tempfile
+import time
+import atexit
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, Optional
 import anthropic
@@ -22,6 +28,48 @@ logger = logging.getLogger(__name__)
 # Load environment variables from .env file
 load_dotenv()
 
+# Create output directory once for all files written by this module
+os.makedirs("output", exist_ok=True)
+
+# HTTP session shared by all dashboard API requests (keep-alive + connection pooling)
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+        # Hand back the last response once retries are exhausted so its status gets logged below
+        raise_on_status=False
+    )
+))
+atexit.register(SESSION.close)
+
+# On-disk caches for processed state data (per date) and Claude responses (per prompt);
+# today's state figures still change on the dashboard, so they expire quickly
+CACHE_DIR = "cache"
+TODAY_STATE_CACHE_TTL_SECONDS = 60
+HISTORICAL_STATE_CACHE_TTL_SECONDS = 24 * 60 * 60
+# In-memory copy of processed state data: date -> (time cached, processed data)
+_processed_state_cache = {}
+
+def _write_cache_file(path, data):
+    """Write a JSON cache entry atomically so a concurrent reader never sees a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Each writer gets its own temp file, so concurrent processes/threads writing the same key never interleave
+    tmp_file = None
+    try:
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+            tmp_file = f.name
+            json.dump(data, f)
+        os.replace(tmp_file, path)
+    except BaseException:
+        if tmp_file and os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
 def get_labour_material_data(date, district=None):
     """
     Fetch labour material ratio data from the NREGS MP dashboard API
@@ -41,7 +89,12 @@ def get_labour_material_data(date, district=None):
         url = f"{base_url}?date={date}"
     
     logger.info(f"Fetching labour material ratio data from: {url}")
-    response = requests.get(url)
+    try:
+        # Transient 429/5xx responses and connection errors are retried by the session adapter
+        response = SESSION.get(url, timeout=(3.05, 30))
+    except requests.RequestException as e:
+        logger.error(f"Failed to fetch labour material ratio data after retries: {str(e)}")
+        return None
     
     if response.status_code == 200:
         logger.info(f"Successfully fetched labour material ratio data from: {url}")
@@ -50,6 +103,29 @@ def get_labour_material_data(date, district=None):
         logger.error(f"Failed to fetch labour material ratio data: {response.status_code}")
         return None
 
+def _format_and_sum_records(records):
+    """
+    Round district/block records in place and total their metrics in a single pass
+    
+    Args:
+        records (list): District or block records from the API
+    
+    Returns:
+        tuple: Sums of labour_percentage, material_percentage and ratio_marks (after rounding)
+    """
+    sum_labour = 0
+    sum_material = 0
+    sum_marks = 0
+    for record in records:
+        for key, value in record.items():
+            if isinstance(value, float):
+                record[key] = round(value, 2)
+        
+        sum_labour += record.get('labour_percentage', 0)
+        sum_material += record.get('material_percentage', 0)
+        sum_marks += record.get('ratio_marks', 0)
+    return sum_labour, sum_material, sum_marks
+
 def process_state_labour_material_data(data):
     """
     Process state-level labour material ratio data to extract top/bottom districts and state averages
@@ -66,38 +142,33 @@ def process_state_labour_material_data(data):
     
     logger.info(f"Processing state labour material data with {len(data['results'])} districts")
     
-    # Format all data points to have 2 decimal places
-    for district in data['results']:
-        for key, value in district.items():
-            if isinstance(value, float):
-                district[key] = round(value, 2)
-    
-    # Sort districts by ratio marks (highest to lowest)
-    sorted_districts = sorted(data['results'], key=lambda x: x.get('ratio_marks', 0), reverse=True)
-    
-    # In case of equal marks, sort by closer to optimal ratio (60:40 labour:material)
-    for i in range(len(sorted_districts) - 1):
-        if sorted_districts[i]['ratio_marks'] == sorted_districts[i+1]['ratio_marks']:
-            optimal_labour = 60  # Assuming optimal ratio is 60:40
-            deviation_i = abs(sorted_districts[i]['labour_percentage'] - optimal_labour)
-            deviation_i_plus_1 = abs(sorted_districts[i+1]['labour_percentage'] - optimal_labour)
-            
-            if deviation_i > deviation_i_plus_1:
-                sorted_districts[i], sorted_districts[i+1] = sorted_districts[i+1], sorted_districts[i]
-    
-    # Add rank to each district
+    # Format all data points to have 2 decimal places, totalling the key metrics in the same pass
+    sum_labour, sum_material, sum_marks = _format_and_sum_records(data['results'])
+    num_districts = len(data['results'])
+    
+    # Sort districts by ratio marks (highest to lowest); in case of equal marks,
+    # the district closer to the optimal ratio (60:40 labour:material) ranks higher
+    optimal_labour = 60  # Assuming optimal ratio is 60:40
+    sorted_districts = sorted(
+        data['results'],
+        key=lambda x: (-x.get('ratio_marks', 0), abs(x.get('labour_percentage', 0) - optimal_labour))
+    )
+    
+    # Add rank to each district and index the full rows by name for O(1) lookups
     district_ranks = {}
+    by_name = {}
     for i, district in enumerate(sorted_districts):
         district_ranks[district['group_name']] = i + 1
+        by_name[district['group_name']] = district
     
     # Extract top 1 and bottom 1 districts
     top_district = sorted_districts[0]
     bottom_district = sorted_districts[-1]
     
     # Calculate state averages for key metrics
-    avg_labour_percentage = round(statistics.mean([d.get('labour_percentage', 0) for d in data['results']]), 2)
-    avg_material_percentage = round(statistics.mean([d.get('material_percentage', 0) for d in data['results']]), 2)
-    avg_ratio_marks = round(statistics.mean([d.get('ratio_marks', 0) for d in data['results']]), 2)
+    avg_labour_percentage = round(sum_labour / num_districts, 2)
+    avg_material_percentage = round(sum_material / num_districts, 2)
+    avg_ratio_marks = round(sum_marks / num_districts, 2)
     
     logger.info(f"Top district: {top_district['group_name']} with ratio marks {top_district.get('ratio_marks', 0)}")
     logger.info(f"Bottom district: {bottom_district['group_name']} with ratio marks {bottom_district.get('ratio_marks', 0)}")
@@ -114,6 +185,7 @@ def process_state_labour_material_data(data):
             "ratio_marks": avg_ratio_marks
         },
         "district_ranks": district_ranks,
+        "by_name": by_name,
         "total_districts": len(sorted_districts)
     }
 
@@ -133,19 +205,17 @@ def process_district_labour_material_data(data):
     
     logger.info(f"Processing district labour material data with {len(data['results'])} blocks")
     
-    # Format all data points to have 2 decimal places
-    for block in data['results']:
-        for key, value in block.items():
-            if isinstance(value, float):
-                block[key] = round(value, 2)
+    # Format all data points to have 2 decimal places, totalling the key metrics in the same pass
+    sum_labour, sum_material, sum_marks = _format_and_sum_records(data['results'])
+    num_blocks = len(data['results'])
     
     # Sort blocks by ratio marks (highest to lowest)
     sorted_blocks = sorted(data['results'], key=lambda x: x.get('ratio_marks', 0), reverse=True)
     
     # Calculate district averages
-    avg_labour_percentage = round(statistics.mean([b.get('labour_percentage', 0) for b in data['results']]), 2)
-    avg_material_percentage = round(statistics.mean([b.get('material_percentage', 0) for b in data['results']]), 2)
-    avg_ratio_marks = round(statistics.mean([b.get('ratio_marks', 0) for b in data['results']]), 2)
+    avg_labour_percentage = round(sum_labour / num_blocks, 2)
+    avg_material_percentage = round(sum_material / num_blocks, 2)
+    avg_ratio_marks = round(sum_marks / num_blocks, 2)
     
     # Get highest and lowest performing blocks
     highest_block = sorted_blocks[0] if sorted_blocks else None
@@ -161,7 +231,7 @@ def process_district_labour_material_data(data):
     return {
         "blocks": sorted_blocks,
         "district_summary": {
-            "total_blocks": len(data['results']),
+            "total_blocks": num_blocks,
             "average_labour_percentage": avg_labour_percentage,
             "average_material_percentage": avg_material_percentage,
             "average_ratio_marks": avg_ratio_marks,
@@ -172,7 +242,61 @@ def process_district_labour_material_data(data):
         }
     }
 
-def generate_labour_material_analysis(state_data, district_data, target_district):
+def get_processed_state(date):
+    """
+    Get processed state-level labour material ratio data for a date
+    
+    Results are cached in memory and in cache/state_{date}.json, for TODAY_STATE_CACHE_TTL_SECONDS
+    when date is today and HISTORICAL_STATE_CACHE_TTL_SECONDS otherwise, so repeated district
+    runs for the same date skip the fetch and the processing.
+    
+    Args:
+        date (str): Date in YYYY-MM-DD format
+    
+    Returns:
+        dict: Processed state data, or None if fetching or processing failed
+    """
+    ttl = TODAY_STATE_CACHE_TTL_SECONDS if date == datetime.now().strftime("%Y-%m-%d") else HISTORICAL_STATE_CACHE_TTL_SECONDS
+    
+    # The in-memory copy expires like the file, so long-running processes pick up dashboard updates
+    cached_entry = _processed_state_cache.get(date)
+    if cached_entry and time.time() - cached_entry[0] < ttl:
+        return cached_entry[1]
+    
+    cache_file = os.path.join(CACHE_DIR, f"state_{date}.json")
+    if os.path.exists(cache_file) and time.time() - os.path.getmtime(cache_file) < ttl:
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if "by_name" not in cached:
+                raise KeyError("by_name")
+            logger.info(f"Using cached state-level labour material ratio data from {cache_file}")
+            # Age the in-memory copy from when the file was written, not when it was read
+            _processed_state_cache[date] = (os.path.getmtime(cache_file), cached)
+            return cached
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable state cache {cache_file}: {str(e)}")
+    
+    state_data = get_labour_material_data(date)
+    if not state_data:
+        logger.error("Failed to get state-level labour material ratio data")
+        return None
+    
+    processed_state_data = process_state_labour_material_data(state_data)
+    if not processed_state_data:
+        logger.error("Failed to process state-level labour material ratio data")
+        return None
+    
+    _write_cache_file(cache_file, processed_state_data)
+    
+    _processed_state_cache[date] = (time.time(), processed_state_data)
+    return processed_state_data
+
+def _prompt_json(obj):
+    """Serialize data for the Claude prompt as compact JSON (indentation only adds tokens)"""
+    return json.dumps(obj, separators=(',', ':'))
+
+def generate_labour_material_analysis(state_data, district_data, target_district, use_cache=True):
     """
     Generate analysis report using Claude 3.7 with thinking mode
     
@@ -180,9 +304,10 @@ def generate_labour_material_analysis(state_data, district_data, target_district
         state_data (dict): Processed state data
         district_data (dict): Processed district data
         target_district (str): Name of the target district
+        use_cache (bool, optional): Reuse a cached Claude response for an identical prompt
     
     Returns:
-        str: Analysis report
+        dict: Claude response as returned by call_claude_api
     """
     # Create prompt template
     prompt = """
@@ -246,8 +371,8 @@ Include district ranking/score in the component, top districts, improvement pote
     
     # Format the prompt with actual data
     formatted_prompt = prompt.format(
-        state_data=json.dumps(state_data, indent=2),
-        district_data=json.dumps(district_data, indent=2),
+        state_data=_prompt_json(state_data),
+        district_data=_prompt_json(district_data),
         target_district=target_district
     )
     
@@ -255,33 +380,52 @@ Include district ranking/score in the component, top districts, improvement pote
     logger.debug(f"Prompt to Claude for labour material analysis:\n{formatted_prompt}")
     
     # Call Claude 3.7 API with thinking mode
-    return call_claude_api(formatted_prompt)
+    return call_claude_api(formatted_prompt, use_cache)
 
-def call_claude_api(prompt):
+def call_claude_api(prompt, use_cache=True):
     """
     Call Claude 3.7 API with thinking mode enabled
     
+    Responses are cached in cache/claude/{model}/ keyed by the SHA-256 of the prompt,
+    so an identical prompt is answered from disk without another API call.
+    
     Args:
         prompt (str): Prompt to send to Claude
+        use_cache (bool, optional): Read and write the prompt-hash response cache
     
     Returns:
-        str: Claude's response
+        dict: Claude's response with model, response_text, thinking_text and token_usage
     """
+    # Set model
+    model = "claude-3-7-sonnet-20250219"
+    
+    # Return a cached response for an identical prompt
+    cache_file = os.path.join(CACHE_DIR, "claude", model, f"{hashlib.sha256(prompt.encode('utf-8')).hexdigest()}.json")
+    if use_cache and os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if "response_text" not in cached:
+                raise KeyError("response_text")
+            logger.info(f"Using cached Claude response from {cache_file}")
+            return cached
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable Claude response cache {cache_file}: {str(e)}")
+    
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
         error_msg = "ANTHROPIC_API_KEY environment variable not set"
         logger.error(error_msg)
         raise ValueError(error_msg)
     
-    # Set model
-    model = "claude-3-7-sonnet-20250219"
     logger.info(f"Using Claude model: {model} with thinking mode")
     
     try:
         client = anthropic.Anthropic(api_key=api_key)
         
-        # Request creation with thinking mode
-        response = client.messages.create(
+        # Stream the response with thinking mode, collecting text as it arrives
+        text_chunks = []
+        with client.messages.stream(
             model=model,
             max_tokens=20000,
             thinking={
@@ -289,7 +433,10 @@ def call_claude_api(prompt):
                 "budget_tokens": 16000
             },
             messages=[{"role": "user", "content": prompt}]
-        )
+        ) as stream:
+            for text in stream.text_stream:
+                text_chunks.append(text)
+            response = stream.get_final_message()
         
         # Log token usage
         prompt_tokens = response.usage.input_tokens
@@ -298,90 +445,54 @@ def call_claude_api(prompt):
         
         logger.info(f"Token usage - Prompt: {prompt_tokens}, Completion: {completion_tokens}, Total: {total_tokens}")
         
-        # Check and log thinking output
-        thinking_output = None
-        if hasattr(response, 'thinking') and response.thinking:
-            thinking_text = response.thinking.thinking_text
-            thinking_tokens = response.thinking.tokens
-            logger.info(f"Thinking mode used: {thinking_tokens} tokens")
-            
-            # Create output directory if it doesn't exist
-            os.makedirs("output", exist_ok=True)
-            
-            # Save thinking to file
-            thinking_file = os.path.join("output", f"labour_material_thinking_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
-            with open(thinking_file, 'w', encoding='utf-8') as f:
-                f.write(thinking_text)
-            logger.info(f"Thinking output saved to {thinking_file}")
-            
-            thinking_output = thinking_text
+        # Thinking arrives as "thinking" content blocks of the final message
+        thinking_output = "".join(block.thinking for block in response.content if block.type == "thinking") or None
+        if thinking_output:
+            logger.info(f"Thinking mode used: {len(thinking_output)} characters of thinking")
         else:
             logger.info("No thinking output received")
         
-        # Extract the actual response text
-        response_text = ""
-        for content_block in response.content:
-            if hasattr(content_block, 'text'):
-                response_text += content_block.text
-        
-        # Create output directory if it doesn't exist
-        os.makedirs("output", exist_ok=True)
-        
-        # Save full response to file
-        response_file = os.path.join("output", f"labour_material_claude_response_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-        with open(response_file, 'w', encoding='utf-8') as f:
-            response_data = {
-                "model": model,
-                "response_text": response_text,
-                "thinking_text": thinking_output,
-                "token_usage": {
-                    "prompt_tokens": prompt_tokens,
-                    "completion_tokens": completion_tokens,
-                    "total_tokens": total_tokens,
-                    "thinking_tokens": thinking_tokens if hasattr(response, 'thinking') and response.thinking else 0
-                }
+        # Assemble the response text from the streamed chunks; persisting it is left to the caller
+        response_data = {
+            "model": model,
+            "response_text": "".join(text_chunks),
+            "thinking_text": thinking_output,
+            "token_usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": total_tokens
             }
-            json.dump(response_data, f, indent=2)
+        }
         
-        logger.info(f"Full response data saved to {response_file}")
+        # A failed cache write must not throw away the response that was just paid for
+        if use_cache:
+            try:
+                _write_cache_file(cache_file, response_data)
+            except OSError as e:
+                logger.warning(f"Failed to cache Claude response to {cache_file}: {str(e)}")
         
-        return response_text
+        return response_data
     
     except Exception as e:
         logger.error(f"Error calling Claude API: {str(e)}")
         raise
 
-def main(date=None, district=None, output_format="text"):
+def _analyze_district(date, district, processed_state_data, output_format, timestamp, district_data=None, use_cache=True):
     """
-    Main function to fetch and process NREGS labour material ratio data, then analyze it
+    Process one district against already processed state data, analyze it and save the output
     
     Args:
-        date (str, optional): Date in YYYY-MM-DD format
-        district (str, optional): District name for specific data
-        output_format (str, optional): Output format ('text' or 'json')
+        date (str): Date in YYYY-MM-DD format
+        district (str): District name
+        processed_state_data (dict): Output of process_state_labour_material_data
+        output_format (str): Output format ('text' or 'json')
+        timestamp (str): Run timestamp used in output filenames
+        district_data (dict, optional): District-level labour material ratio data, fetched if not given
+        use_cache (bool, optional): Reuse a cached Claude response for an identical prompt
     
     Returns:
         Union[str, dict]: Analysis result in specified format
     """
-    logger.info(f"Starting NREGS labour material ratio analysis for district: {district}, date: {date if date else 'current'}")
-    
-    # Use current date if none provided
-    if not date:
-        date = datetime.now().strftime("%Y-%m-%d")
-        logger.info(f"Using current date: {date}")
-    
-    # Get state-level data
-    logger.info("Fetching state-level labour material ratio data")
-    state_data = get_labour_material_data(date)
-    if not state_data:
-        logger.error("Failed to get state-level labour material ratio data")
-        return None
-    
-    processed_state_data = process_state_labour_material_data(state_data)
-    if not processed_state_data:
-        logger.error("Failed to process state-level labour material ratio data")
-        return None
-    
     result = {
         "date": date,
         "state_data": {
@@ -391,15 +502,10 @@ def main(date=None, district=None, output_format="text"):
         }
     }
     
-    # Check if district is provided
-    if not district:
-        error_msg = "District name is required for analysis"
-        logger.error(error_msg)
-        return error_msg
-    
-    # Get district-level data
-    logger.info(f"Fetching labour material ratio data for district: {district}")
-    district_data = get_labour_material_data(date, district)
+    # Get district-level data unless it was fetched by the caller
+    if district_data is None:
+        logger.info(f"Fetching labour material ratio data for district: {district}")
+        district_data = get_labour_material_data(date, district)
     if not district_data:
         logger.error(f"Failed to get labour material ratio data for district: {district}")
         return None
@@ -414,11 +520,7 @@ def main(date=None, district=None, output_format="text"):
     total_districts = processed_state_data["total_districts"]
     
     # Find the district data in the state data for complete information
-    target_district_data = None
-    for d in state_data['results']:
-        if d['group_name'] == district:
-            target_district_data = d
-            break
+    target_district_data = processed_state_data["by_name"].get(district)
     
     result["district_data"] = {
         "district_name": district,
@@ -429,22 +531,24 @@ def main(date=None, district=None, output_format="text"):
     }
     
     # Generate analysis using Claude
-    logger.info("Generating labour material ratio analysis using Claude 3.7")
-    analysis = generate_labour_material_analysis(
+    logger.info(f"Generating labour material ratio analysis for {district} using Claude 3.7")
+    claude_response = generate_labour_material_analysis(
         result["state_data"], 
         result["district_data"], 
-        district
+        district,
+        use_cache
     )
+    analysis = claude_response["response_text"]
     
-    # Create output directory if it doesn't exist
-    os.makedirs("output", exist_ok=True)
-    
-    # Create output based on requested format
+    # Create output based on requested format; this is the only file written per analysis
     if output_format == "json":
         result["analysis"] = analysis
+        result["model"] = claude_response.get("model")
+        result["thinking_text"] = claude_response.get("thinking_text")
+        result["token_usage"] = claude_response.get("token_usage")
         
         # Save output to file
-        filename = os.path.join("output", f"nregs_labour_material_analysis_{district.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        filename = os.path.join("output", f"nregs_labour_material_analysis_{district.lower()}_{timestamp}.json")
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(result, f, indent=4)
         logger.info(f"Analysis saved to {filename}")
@@ -452,31 +556,138 @@ def main(date=None, district=None, output_format="text"):
         return result
     else:
         # Save output to file
-        filename = os.path.join("output", f"nregs_labour_material_analysis_{district.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+        filename = os.path.join("output", f"nregs_labour_material_analysis_{district.lower()}_{timestamp}.txt")
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(analysis)
         logger.info(f"Analysis saved to {filename}")
         
         return analysis
 
+def main(date=None, district=None, output_format="text", use_cache=True):
+    """
+    Main function to fetch and process NREGS labour material ratio data, then analyze it
+    
+    Args:
+        date (str, optional): Date in YYYY-MM-DD format
+        district (str, optional): District name for specific data
+        output_format (str, optional): Output format ('text' or 'json')
+        use_cache (bool, optional): Reuse a cached Claude response for an identical prompt
+    
+    Returns:
+        Union[str, dict]: Analysis result in specified format
+    """
+    logger.info(f"Starting NREGS labour material ratio analysis for district: {district}, date: {date if date else 'current'}")
+    
+    # One timestamp per run, shared by all output filenames
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
+    
+    # Use current date if none provided
+    if not date:
+        date = now.strftime("%Y-%m-%d")
+        logger.info(f"Using current date: {date}")
+    
+    # Fetch state-level and district-level data concurrently
+    logger.info("Fetching state-level and district-level labour material ratio data")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        state_future = executor.submit(get_processed_state, date)
+        district_future = executor.submit(get_labour_material_data, date, district) if district else None
+        processed_state_data = state_future.result()
+        district_data = district_future.result() if district_future else None
+    
+    if not processed_state_data:
+        logger.error("Failed to get state-level labour material ratio data")
+        return None
+    
+    # Check if district is provided
+    if not district:
+        error_msg = "District name is required for analysis"
+        logger.error(error_msg)
+        return error_msg
+    
+    # Check district-level data
+    if not district_data:
+        logger.error(f"Failed to get labour material ratio data for district: {district}")
+        return None
+    
+    return _analyze_district(date, district, processed_state_data, output_format, timestamp, district_data, use_cache)
+
+def analyze_districts(date=None, districts=None, output_format="text", max_workers=8, use_cache=True):
+    """
+    Analyze several districts in one run, fetching and processing the state-level data only once
+    
+    Districts are fetched and analyzed concurrently, with at most max_workers in flight.
+    
+    Args:
+        date (str, optional): Date in YYYY-MM-DD format
+        districts (list): District names to analyze
+        output_format (str, optional): Output format ('text' or 'json')
+        max_workers (int, optional): Maximum number of districts processed at the same time
+        use_cache (bool, optional): Reuse cached Claude responses for identical prompts
+    
+    Returns:
+        dict: District name mapped to its analysis result in specified format (None on failure)
+    """
+    logger.info(f"Starting NREGS labour material ratio analysis for {len(districts or [])} districts, date: {date if date else 'current'}")
+    
+    if not districts:
+        logger.error("At least one district name is required for analysis")
+        return {}
+    
+    # One timestamp per run, shared by all output filenames
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
+    
+    # Use current date if none provided
+    if not date:
+        date = now.strftime("%Y-%m-%d")
+        logger.info(f"Using current date: {date}")
+    
+    # Get and process state-level data once for all districts
+    logger.info("Fetching state-level labour material ratio data")
+    processed_state_data = get_processed_state(date)
+    if not processed_state_data:
+        logger.error("Failed to get state-level labour material ratio data")
+        return {district: None for district in districts}
+    
+    def analyze_one(district):
+        try:
+            return _analyze_district(date, district, processed_state_data, output_format, timestamp, use_cache=use_cache)
+        except Exception as e:
+            logger.error(f"Error analyzing district {district}: {str(e)}")
+            return None
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(districts, executor.map(analyze_one, districts)))
+
 if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description='NREGS Labour Material Ratio Data Analysis')
     parser.add_argument('--date', type=str, help='Date in YYYY-MM-DD format')
-    parser.add_argument('--district', type=str, required=True, help='District name')
+    parser.add_argument('--district', type=str, nargs='+', required=True,
+                        help='District name (several names analyze the districts in one batch)')
     parser.add_argument('--output', type=str, default="text", choices=["text", "json"],
                         help='Output format (text or json)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always call Claude instead of reusing a cached response for the same prompt')
     
     args = parser.parse_args()
     
     try:
-        result = main(args.date, args.district, args.output)
+        if len(args.district) == 1:
+            result = main(args.date, args.district[0], args.output, use_cache=not args.no_cache)
+        else:
+            result = analyze_districts(args.date, args.district, args.output, use_cache=not args.no_cache)
         
         if args.output == "json":
             print(json.dumps(result, indent=4))
-        else:
+        elif len(args.district) == 1:
             print(result)
+        else:
+            for name, analysis in result.items():
+                print(f"===== {name} =====")
+                print(analysis)
     except Exception as e:
         logger.error(f"Error in main execution: {str(e)}")
         print(f"Error: {str(e)}")
\ No newline at end of file
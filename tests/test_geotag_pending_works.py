@@ -0,0 +1,30 @@
+import copy
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import geotag_pending_works
+
+
+STATE_DATA = {
+    "results": [
+        {"group_name": name, "geotag_marks": marks}
+        for name, marks in [("A", 2.0), ("B", 3.0), ("C", 2.0), ("D", 3.0), ("E", 0.0)]
+    ]
+}
+
+
+class ProcessStateGeotagDataRankTest(unittest.TestCase):
+    def test_target_rank_matches_full_ranking_with_tied_marks(self):
+        district_ranks = geotag_pending_works.process_state_geotag_data(copy.deepcopy(STATE_DATA))["district_ranks"]
+        self.assertEqual(district_ranks, {"B": 1, "D": 2, "A": 3, "C": 4, "E": 5})
+        
+        for name, rank in district_ranks.items():
+            processed = geotag_pending_works.process_state_geotag_data(copy.deepcopy(STATE_DATA), target_district=name)
+            self.assertEqual(processed["target_rank"], rank, name)
+
+
+if __name__ == "__main__":
+    unittest.main()
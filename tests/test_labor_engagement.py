@@ -0,0 +1,48 @@
+import copy
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import labor_engagement
+
+
+def _district(name, ratio):
+    return {
+        "group_name": name,
+        "ratio": ratio,
+        "marks": 1.0,
+        "30_day_avg_labour_expected": 10.0,
+        "total_registered_workers": 100
+    }
+
+
+STATE_DATA = {
+    "results": [
+        _district("A", 0.5),
+        _district("B", 0.7),
+        _district("C", 0.5),
+        _district("D", 0.9),
+        _district("E", 0.5),
+        _district("F", 0.1)
+    ]
+}
+
+
+class ProcessStateDataRankTest(unittest.TestCase):
+    def test_target_rank_matches_full_ranking_with_tied_ratios(self):
+        district_ranks = labor_engagement.process_state_data(copy.deepcopy(STATE_DATA))["district_ranks"]
+        self.assertEqual(district_ranks, {"D": 1, "B": 2, "A": 3, "C": 4, "E": 5, "F": 6})
+        
+        for name, rank in district_ranks.items():
+            processed = labor_engagement.process_state_data(copy.deepcopy(STATE_DATA), target_district=name)
+            self.assertEqual(processed["target_rank"], rank, name)
+
+    def test_unknown_target_has_no_rank(self):
+        processed = labor_engagement.process_state_data(copy.deepcopy(STATE_DATA), target_district="Z")
+        self.assertIsNone(processed["target_rank"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,15 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-import statistics
 import os
+import tempfile
+import time
+import atexit
+import hashlib
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, Optional
 import anthropic
@@ -22,6 +29,124 @@ logger = logging.getLogger(__name__)
 # Load environment variables from .env file
 load_dotenv()
 
+# Create output directory once for all files written by this module
+os.makedirs("output", exist_ok=True)
+
+# Anthropic client shared by all Claude calls (including batch threads), created on first use
+_anthropic_client: Optional[anthropic.Anthropic] = None
+_anthropic_client_lock = threading.Lock()
+
+def get_anthropic_client(api_key):
+    """
+    Return the module-level Anthropic client, creating it on first use
+    
+    Args:
+        api_key (str): Anthropic API key
+    
+    Returns:
+        anthropic.Anthropic: Shared client
+    """
+    global _anthropic_client
+    with _anthropic_client_lock:
+        if _anthropic_client is None:
+            _anthropic_client = anthropic.Anthropic(api_key=api_key)
+    return _anthropic_client
+
+# Background pool for writing Claude output dumps without blocking the caller
+_IO_POOL = ThreadPoolExecutor(max_workers=2)
+atexit.register(_IO_POOL.shutdown, wait=True)
+
+def _write_file(path, content, description):
+    """Write text to a file and log where it was saved (runs on _IO_POOL)"""
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        logger.info(f"{description} saved to {path}")
+    except OSError as e:
+        logger.error(f"Failed to save {description.lower()} to {path}: {str(e)}")
+
+# HTTP session shared by all dashboard API requests (keep-alive + connection pooling)
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[502, 503, 504],
+        allowed_methods=frozenset(['GET']),
+        # Hand back the last response once retries are exhausted so its status gets logged
+        raise_on_status=False
+    )
+))
+atexit.register(SESSION.close)
+
+# On-disk cache for dashboard API responses, configurable through the environment
+CACHE_DIR = os.getenv("NREGA_CACHE_DIR", "cache")
+DEFAULT_CACHE_TTL_SECONDS = 6 * 60 * 60
+
+def _cache_ttl_from_env():
+    """Read NREGA_CACHE_TTL in seconds, falling back to the default if it is unset or malformed."""
+    value = os.getenv("NREGA_CACHE_TTL")
+    if not value:
+        return DEFAULT_CACHE_TTL_SECONDS
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"Ignoring invalid NREGA_CACHE_TTL={value!r}, using {DEFAULT_CACHE_TTL_SECONDS} seconds")
+        return DEFAULT_CACHE_TTL_SECONDS
+
+CACHE_TTL_SECONDS = _cache_ttl_from_env()
+
+# Claude responses are cached by prompt hash unless NREGA_CLAUDE_CACHE=0
+CLAUDE_CACHE_ENABLED = os.getenv("NREGA_CLAUDE_CACHE", "1") != "0"
+
+def _write_cache_file(path, content):
+    """Write a cache entry (bytes) atomically so a concurrent reader never sees a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Each writer gets its own temp file, so concurrent processes/threads writing the same key never interleave
+    tmp_file = None
+    try:
+        with tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+            tmp_file = f.name
+            f.write(content)
+        os.replace(tmp_file, path)
+    except BaseException:
+        if tmp_file and os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+def _fetch_response_body(url):
+    """
+    Fetch the raw response body for a dashboard API URL, cached on disk
+    
+    A response saved under CACHE_DIR less than CACHE_TTL_SECONDS ago is returned without a request.
+    
+    Args:
+        url (str): Full API URL
+    
+    Returns:
+        bytes: Response body
+    
+    Raises:
+        requests.HTTPError: If the response status is not 200 (failures are not cached)
+    """
+    cache_file = os.path.join(CACHE_DIR, f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json")
+    try:
+        if time.time() - os.path.getmtime(cache_file) < CACHE_TTL_SECONDS:
+            with open(cache_file, 'rb') as f:
+                logger.info(f"Using cached response from {cache_file}")
+                return f.read()
+    except OSError:
+        pass
+    
+    response = SESSION.get(url, timeout=(3.05, 30))
+    if response.status_code != 200:
+        raise requests.HTTPError(f"Unexpected status code {response.status_code}", response=response)
+    
+    _write_cache_file(cache_file, response.content)
+    return response.content
+
 def get_timely_payment_data(date, district=None):
     """
     Fetch timely payment data from the NREGS MP dashboard API
@@ -35,20 +160,44 @@ def get_timely_payment_data(date, district=None):
     """
     base_url = "https://dashboard.nregsmp.org/api/employment_workers/timely-payment"
     
-    if district:
-        url = f"{base_url}?date={date}&district={district}"
-    else:
-        url = f"{base_url}?date={date}"
+    # Let requests encode the query string (district names may contain spaces)
+    params = {"date": date, "district": district} if district else {"date": date}
+    url = requests.Request("GET", base_url, params=params).prepare().url
     
     logger.info(f"Fetching timely payment data from: {url}")
-    response = requests.get(url)
-    
-    if response.status_code == 200:
-        logger.info(f"Successfully fetched timely payment data from: {url}")
-        return response.json()
-    else:
-        logger.error(f"Failed to fetch timely payment data: {response.status_code}")
+    try:
+        response_body = _fetch_response_body(url)
+    except requests.HTTPError as e:
+        logger.error(f"Failed to fetch timely payment data: {e.response.status_code}")
         return None
+    except requests.RequestException as e:
+        logger.error(f"Failed to fetch timely payment data after retries: {str(e)}")
+        return None
+    
+    # Parse on every call so callers get their own copy (the processors modify it in place)
+    logger.info(f"Successfully fetched timely payment data from: {url}")
+    return json.loads(response_body)
+
+def _format_and_sum_records(records):
+    """
+    Round district/block records in place and total their metrics in a single pass
+    
+    Args:
+        records (list): District or block records from the API
+    
+    Returns:
+        tuple: Sums of timely_fto_generation_pct and timely_payment_marks (after rounding)
+    """
+    sum_fto = 0
+    sum_marks = 0
+    for record in records:
+        for key, value in record.items():
+            if isinstance(value, float):
+                record[key] = round(value, 2)
+        
+        sum_fto += record.get('timely_fto_generation_pct', 0)
+        sum_marks += record.get('timely_payment_marks', 0)
+    return sum_fto, sum_marks
 
 def process_state_timely_payment_data(data):
     """
@@ -66,33 +215,27 @@ def process_state_timely_payment_data(data):
     
     logger.info(f"Processing state timely payment data with {len(data['results'])} districts")
     
-    # Format all data points to have 2 decimal places
-    for district in data['results']:
-        for key, value in district.items():
-            if isinstance(value, float):
-                district[key] = round(value, 2)
-    
-    # Sort districts by payment marks (highest to lowest)
-    sorted_districts = sorted(data['results'], key=lambda x: x.get('timely_payment_marks', 0), reverse=True)
+    # Format all data points to have 2 decimal places, totalling the key metrics in the same pass
+    sum_fto, sum_marks = _format_and_sum_records(data['results'])
+    num_districts = len(data['results'])
     
-    # In case of equal marks, sort by FTO generation percentage
-    for i in range(len(sorted_districts) - 1):
-        if sorted_districts[i]['timely_payment_marks'] == sorted_districts[i+1]['timely_payment_marks']:
-            if sorted_districts[i]['timely_fto_generation_pct'] < sorted_districts[i+1]['timely_fto_generation_pct']:
-                sorted_districts[i], sorted_districts[i+1] = sorted_districts[i+1], sorted_districts[i]
+    # Sort districts by payment marks (highest to lowest), in case of equal marks by FTO generation percentage
+    sorted_districts = sorted(
+        data['results'],
+        key=lambda x: (-x.get('timely_payment_marks', 0), -x.get('timely_fto_generation_pct', 0))
+    )
     
-    # Add rank to each district
-    district_ranks = {}
-    for i, district in enumerate(sorted_districts):
-        district_ranks[district['group_name']] = i + 1
+    # Add rank to each district and index the full rows by name for O(1) lookups
+    district_ranks = {district['group_name']: rank for rank, district in enumerate(sorted_districts, start=1)}
+    by_name = {district['group_name']: district for district in sorted_districts}
     
     # Extract top 1 and bottom 1 districts
     top_district = sorted_districts[0]
     bottom_district = sorted_districts[-1]
     
     # Calculate state averages for key metrics
-    avg_timely_fto_generation_pct = round(statistics.mean([d.get('timely_fto_generation_pct', 0) for d in data['results']]), 2)
-    avg_timely_payment_marks = round(statistics.mean([d.get('timely_payment_marks', 0) for d in data['results']]), 2)
+    avg_timely_fto_generation_pct = round(sum_fto / num_districts, 2)
+    avg_timely_payment_marks = round(sum_marks / num_districts, 2)
     
     logger.info(f"Top district: {top_district['group_name']} with timely payment marks {top_district.get('timely_payment_marks', 0)}")
     logger.info(f"Bottom district: {bottom_district['group_name']} with timely payment marks {bottom_district.get('timely_payment_marks', 0)}")
@@ -107,6 +250,7 @@ def process_state_timely_payment_data(data):
             "timely_payment_marks": avg_timely_payment_marks
         },
         "district_ranks": district_ranks,
+        "by_name": by_name,
         "total_districts": len(sorted_districts)
     }
 
@@ -126,18 +270,19 @@ def process_district_timely_payment_data(data):
     
     logger.info(f"Processing district timely payment data with {len(data['results'])} blocks")
     
-    # Format all data points to have 2 decimal places
-    for block in data['results']:
-        for key, value in block.items():
-            if isinstance(value, float):
-                block[key] = round(value, 2)
+    # Format all data points to have 2 decimal places, totalling the key metrics in the same pass
+    sum_fto, sum_marks = _format_and_sum_records(data['results'])
+    num_blocks = len(data['results'])
     
-    # Sort blocks by payment marks (highest to lowest)
-    sorted_blocks = sorted(data['results'], key=lambda x: x.get('timely_payment_marks', 0), reverse=True)
+    # Sort blocks by payment marks (highest to lowest), in case of equal marks by FTO generation percentage
+    sorted_blocks = sorted(
+        data['results'],
+        key=lambda x: (-x.get('timely_payment_marks', 0), -x.get('timely_fto_generation_pct', 0))
+    )
     
     # Calculate district averages
-    avg_timely_fto_generation_pct = round(statistics.mean([b.get('timely_fto_generation_pct', 0) for b in data['results']]), 2)
-    avg_timely_payment_marks = round(statistics.mean([b.get('timely_payment_marks', 0) for b in data['results']]), 2)
+    avg_timely_fto_generation_pct = round(sum_fto / num_blocks, 2)
+    avg_timely_payment_marks = round(sum_marks / num_blocks, 2)
     
     # Get highest and lowest performing blocks
     highest_block = sorted_blocks[0] if sorted_blocks else None
@@ -152,7 +297,7 @@ def process_district_timely_payment_data(data):
     return {
         "blocks": sorted_blocks,
         "district_summary": {
-            "total_blocks": len(data['results']),
+            "total_blocks": num_blocks,
             "average_timely_fto_generation_pct": avg_timely_fto_generation_pct,
             "average_timely_payment_marks": avg_timely_payment_marks,
             "highest_performing_block": highest_block['group_name'] if highest_block else None,
@@ -162,20 +307,8 @@ def process_district_timely_payment_data(data):
         }
     }
 
-def generate_timely_payment_analysis(state_data, district_data, target_district):
-    """
-    Generate analysis report using Claude 3.7 with thinking mode
-    
-    Args:
-        state_data (dict): Processed state data
-        district_data (dict): Processed district data
-        target_district (str): Name of the target district
-    
-    Returns:
-        str: Analysis report
-    """
-    # Create prompt template
-    prompt = """
+# Prompt template for the timely payment analysis, filled in by generate_timely_payment_analysis
+_PROMPT_TEMPLATE = """
 You are an AI analyst tasked with evaluating the performance of districts and blocks in Madhya Pradesh, India,
 based on the National Rural Employment Guarantee Act (NREGA) data. Your goal is to provide a concise, 
 professional analysis of a target district's performance in relation to the state's top and bottom performers,
@@ -233,45 +366,87 @@ Ensure that your analysis is based solely on the provided data and focuses on th
 Your response should contain data to validate your points. give key insights of district,block and improvement potential. 
 Include district ranking/score in the component, top districts, improvement potential and suggestions, blocks in the district who are performig good and bad. 
 """
+
+def _prompt_json(obj):
+    """Serialize data for the Claude prompt as compact JSON (indentation only adds tokens)"""
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+def generate_timely_payment_analysis(state_data, district_data, target_district, timestamp=None):
+    """
+    Generate analysis report using Claude 3.7 with thinking mode
+    
+    Args:
+        state_data (dict): Processed state data
+        district_data (dict): Processed district data
+        target_district (str): Name of the target district
+        timestamp (str, optional): Run timestamp used in output filenames, defaults to now
     
-    # Format the prompt with actual data
-    formatted_prompt = prompt.format(
-        state_data=json.dumps(state_data, indent=2),
-        district_data=json.dumps(district_data, indent=2),
-        target_district=target_district
+    Returns:
+        str: Analysis report
+    """
+    # Fill in the prompt template with actual data
+    formatted_prompt = (
+        _PROMPT_TEMPLATE
+        .replace("{state_data}", _prompt_json(state_data))
+        .replace("{district_data}", _prompt_json(district_data))
+        .replace("{target_district}", target_district)
     )
     
     # Log the prompt (optional, can be disabled for production)
-    logger.debug(f"Prompt to Claude for timely payment analysis:\n{formatted_prompt}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Prompt to Claude for timely payment analysis:\n%s", formatted_prompt)
     
     # Call Claude 3.7 API with thinking mode
-    return call_claude_api(formatted_prompt)
+    return call_claude_api(formatted_prompt, timestamp, target_district)
 
-def call_claude_api(prompt):
+def call_claude_api(prompt, timestamp=None, district=None):
     """
     Call Claude 3.7 API with thinking mode enabled
     
+    Responses are cached under CACHE_DIR/claude keyed by the SHA-256 of model and prompt,
+    so an identical request is answered from disk (disable with NREGA_CLAUDE_CACHE=0).
+    
     Args:
         prompt (str): Prompt to send to Claude
+        timestamp (str, optional): Run timestamp used in output filenames, defaults to now
+        district (str, optional): District name added to output filenames so batch runs don't collide
     
     Returns:
         str: Claude's response
     """
+    # Set model
+    model = "claude-3-7-sonnet-20250219"
+    
+    # Return a cached response for an identical request
+    cache_key = hashlib.sha256((model + prompt).encode('utf-8')).hexdigest()
+    cache_file = os.path.join(CACHE_DIR, "claude", f"{cache_key}.json")
+    if CLAUDE_CACHE_ENABLED and os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = json.loads(f.read())
+            logger.info(f"Using cached Claude response from {cache_file}")
+            return cached["response_text"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable Claude response cache {cache_file}: {str(e)}")
+    
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
         error_msg = "ANTHROPIC_API_KEY environment variable not set"
         logger.error(error_msg)
         raise ValueError(error_msg)
     
-    # Set model
-    model = "claude-3-7-sonnet-20250219"
+    if not timestamp:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    file_suffix = f"{district.lower()}_{timestamp}" if district else timestamp
+    
     logger.info(f"Using Claude model: {model} with thinking mode")
     
     try:
-        client = anthropic.Anthropic(api_key=api_key)
+        client = get_anthropic_client(api_key)
         
-        # Request creation with thinking mode
-        response = client.messages.create(
+        # Stream the response with thinking mode, collecting text as it arrives
+        text_chunks = []
+        with client.messages.stream(
             model=model,
             max_tokens=20000,
             thinking={
@@ -279,7 +454,10 @@ def call_claude_api(prompt):
                 "budget_tokens": 16000
             },
             messages=[{"role": "user", "content": prompt}]
-        )
+        ) as stream:
+            for text in stream.text_stream:
+                text_chunks.append(text)
+            response = stream.get_final_message()
         
         # Log token usage
         prompt_tokens = response.usage.input_tokens
@@ -288,52 +466,41 @@ def call_claude_api(prompt):
         
         logger.info(f"Token usage - Prompt: {prompt_tokens}, Completion: {completion_tokens}, Total: {total_tokens}")
         
-        # Check and log thinking output
-        thinking_output = None
-        if hasattr(response, 'thinking') and response.thinking:
-            thinking_text = response.thinking.thinking_text
-            thinking_tokens = response.thinking.tokens
-            logger.info(f"Thinking mode used: {thinking_tokens} tokens")
-            
-            # Create output directory if it doesn't exist
-            os.makedirs("output", exist_ok=True)
+        # Thinking arrives as "thinking" content blocks of the final message, collected once
+        thinking_output = "".join(block.thinking for block in response.content if block.type == "thinking") or None
+        if thinking_output:
+            logger.info(f"Thinking mode used: {len(thinking_output)} characters of thinking")
             
             # Save thinking to file
-            thinking_file = os.path.join("output", f"timely_payment_thinking_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
-            with open(thinking_file, 'w', encoding='utf-8') as f:
-                f.write(thinking_text)
-            logger.info(f"Thinking output saved to {thinking_file}")
-            
-            thinking_output = thinking_text
+            thinking_file = os.path.join("output", f"timely_payment_thinking_{file_suffix}.txt")
+            _IO_POOL.submit(_write_file, thinking_file, thinking_output, "Thinking output")
         else:
             logger.info("No thinking output received")
         
-        # Extract the actual response text
-        response_text = ""
-        for content_block in response.content:
-            if hasattr(content_block, 'text'):
-                response_text += content_block.text
-        
-        # Create output directory if it doesn't exist
-        os.makedirs("output", exist_ok=True)
+        # Assemble the response text from the streamed chunks
+        response_text = "".join(text_chunks)
         
         # Save full response to file
-        response_file = os.path.join("output", f"timely_payment_claude_response_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-        with open(response_file, 'w', encoding='utf-8') as f:
-            response_data = {
-                "model": model,
-                "response_text": response_text,
-                "thinking_text": thinking_output,
-                "token_usage": {
-                    "prompt_tokens": prompt_tokens,
-                    "completion_tokens": completion_tokens,
-                    "total_tokens": total_tokens,
-                    "thinking_tokens": thinking_tokens if hasattr(response, 'thinking') and response.thinking else 0
-                }
+        response_file = os.path.join("output", f"timely_payment_claude_response_{file_suffix}.json")
+        response_data = {
+            "model": model,
+            "response_text": response_text,
+            "thinking_text": thinking_output,
+            "token_usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": total_tokens
             }
-            json.dump(response_data, f, indent=2)
+        }
+        _IO_POOL.submit(_write_file, response_file, json.dumps(response_data, indent=2), "Full response data")
         
-        logger.info(f"Full response data saved to {response_file}")
+        # A failed cache write must not throw away the response that was just paid for
+        if CLAUDE_CACHE_ENABLED:
+            cache_entry = {"response_text": response_text, "thinking_text": thinking_output}
+            try:
+                _write_cache_file(cache_file, json.dumps(cache_entry).encode('utf-8'))
+            except OSError as e:
+                logger.warning(f"Failed to cache Claude response to {cache_file}: {str(e)}")
         
         return response_text
     
@@ -341,36 +508,28 @@ def call_claude_api(prompt):
         logger.error(f"Error calling Claude API: {str(e)}")
         raise
 
-def main(date=None, district=None, output_format="text"):
+def _analyze_district(date, district, processed_state_data, output_format, timestamp, district_data=None):
     """
-    Main function to fetch and process NREGS timely payment data, then analyze it
+    Process one district against already processed state data, analyze it and save the output
     
     Args:
-        date (str, optional): Date in YYYY-MM-DD format
-        district (str, optional): District name for specific data
-        output_format (str, optional): Output format ('text' or 'json')
+        date (str): Date in YYYY-MM-DD format
+        district (str): District name
+        processed_state_data (dict): Output of process_state_timely_payment_data
+        output_format (str): Output format ('text' or 'json')
+        timestamp (str): Run timestamp used in output filenames
+        district_data (dict, optional): District-level timely payment data, fetched if not given
     
     Returns:
         Union[str, dict]: Analysis result in specified format
     """
-    logger.info(f"Starting NREGS timely payment analysis for district: {district}, date: {date if date else 'current'}")
-    
-    # Use current date if none provided
-    if not date:
-        date = datetime.now().strftime("%Y-%m-%d")
-        logger.info(f"Using current date: {date}")
-    
-    # Get state-level data
-    logger.info("Fetching state-level timely payment data")
-    state_data = get_timely_payment_data(date)
-    if not state_data:
-        logger.error("Failed to get state-level timely payment data")
-        return None
-    
-    processed_state_data = process_state_timely_payment_data(state_data)
-    if not processed_state_data:
-        logger.error("Failed to process state-level timely payment data")
-        return None
+    # Skip the district fetch and the Claude call for names the state data doesn't know
+    target_district_data = processed_state_data["by_name"].get(district)
+    if target_district_data is None:
+        error_msg = f"Unknown district: {district}"
+        logger.error(error_msg)
+        # JSON callers read .get("analysis") from the result, so only text mode gets the message
+        return error_msg if output_format == "text" else None
     
     result = {
         "date": date,
@@ -381,15 +540,10 @@ def main(date=None, district=None, output_format="text"):
         }
     }
     
-    # Check if district is provided
-    if not district:
-        error_msg = "District name is required for analysis"
-        logger.error(error_msg)
-        return error_msg
-    
-    # Get district-level data
-    logger.info(f"Fetching timely payment data for district: {district}")
-    district_data = get_timely_payment_data(date, district)
+    # Get district-level data unless it was fetched by the caller
+    if district_data is None:
+        logger.info(f"Fetching timely payment data for district: {district}")
+        district_data = get_timely_payment_data(date, district)
     if not district_data:
         logger.error(f"Failed to get timely payment data for district: {district}")
         return None
@@ -403,13 +557,6 @@ def main(date=None, district=None, output_format="text"):
     district_rank = processed_state_data["district_ranks"].get(district, None)
     total_districts = processed_state_data["total_districts"]
     
-    # Find the district data in the state data for complete information
-    target_district_data = None
-    for d in state_data['results']:
-        if d['group_name'] == district:
-            target_district_data = d
-            break
-    
     result["district_data"] = {
         "district_name": district,
         "state_rank": district_rank,
@@ -419,54 +566,169 @@ def main(date=None, district=None, output_format="text"):
     }
     
     # Generate analysis using Claude
-    logger.info("Generating timely payment analysis using Claude 3.7")
+    logger.info(f"Generating timely payment analysis for {district} using Claude 3.7")
     analysis = generate_timely_payment_analysis(
         result["state_data"], 
         result["district_data"], 
-        district
+        district,
+        timestamp
     )
     
-    # Create output directory if it doesn't exist
-    os.makedirs("output", exist_ok=True)
-    
     # Create output based on requested format
     if output_format == "json":
         result["analysis"] = analysis
         
         # Save output to file
-        filename = os.path.join("output", f"nregs_timely_payment_analysis_{district.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        filename = os.path.join("output", f"nregs_timely_payment_analysis_{district.lower()}_{timestamp}.json")
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=4)
+            f.write(json.dumps(result, indent=4))
         logger.info(f"Analysis saved to {filename}")
         
         return result
     else:
         # Save output to file
-        filename = os.path.join("output", f"nregs_timely_payment_analysis_{district.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+        filename = os.path.join("output", f"nregs_timely_payment_analysis_{district.lower()}_{timestamp}.txt")
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(analysis)
         logger.info(f"Analysis saved to {filename}")
         
         return analysis
 
+def main(date=None, district=None, output_format="text"):
+    """
+    Main function to fetch and process NREGS timely payment data, then analyze it
+    
+    Args:
+        date (str, optional): Date in YYYY-MM-DD format
+        district (str, optional): District name for specific data
+        output_format (str, optional): Output format ('text' or 'json')
+    
+    Returns:
+        Union[str, dict]: Analysis result in specified format
+    """
+    logger.info(f"Starting NREGS timely payment analysis for district: {district}, date: {date if date else 'current'}")
+    
+    # One timestamp per run, shared by all output filenames
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
+    
+    # Use current date if none provided
+    if not date:
+        date = now.strftime("%Y-%m-%d")
+        logger.info(f"Using current date: {date}")
+    
+    # Fetch state-level and district-level data concurrently
+    logger.info("Fetching state-level and district-level timely payment data")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        state_future = executor.submit(get_timely_payment_data, date)
+        district_future = executor.submit(get_timely_payment_data, date, district) if district else None
+        state_data = state_future.result()
+        district_data = district_future.result() if district_future else None
+    
+    if not state_data:
+        logger.error("Failed to get state-level timely payment data")
+        return None
+    
+    processed_state_data = process_state_timely_payment_data(state_data)
+    if not processed_state_data:
+        logger.error("Failed to process state-level timely payment data")
+        return None
+    
+    # Check if district is provided
+    if not district:
+        error_msg = "District name is required for analysis"
+        logger.error(error_msg)
+        return error_msg
+    
+    # Check district-level data
+    if not district_data:
+        logger.error(f"Failed to get timely payment data for district: {district}")
+        return None
+    
+    return _analyze_district(date, district, processed_state_data, output_format, timestamp, district_data)
+
+def analyze_districts(date=None, districts=None, output_format="text", max_workers=4):
+    """
+    Analyze several districts in one run, fetching and processing the state-level data only once
+    
+    Districts are fetched and analyzed concurrently, with at most max_workers in flight.
+    
+    Args:
+        date (str, optional): Date in YYYY-MM-DD format
+        districts (list): District names to analyze
+        output_format (str, optional): Output format ('text' or 'json')
+        max_workers (int, optional): Maximum number of districts processed at the same time
+    
+    Returns:
+        dict: District name mapped to its analysis result in specified format (None on failure)
+    """
+    logger.info(f"Starting NREGS timely payment analysis for {len(districts or [])} districts, date: {date if date else 'current'}")
+    
+    if not districts:
+        logger.error("At least one district name is required for analysis")
+        return {}
+    
+    # One timestamp per run, shared by all output filenames
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
+    
+    # Use current date if none provided
+    if not date:
+        date = now.strftime("%Y-%m-%d")
+        logger.info(f"Using current date: {date}")
+    
+    # Get and process state-level data once for all districts
+    logger.info("Fetching state-level timely payment data")
+    state_data = get_timely_payment_data(date)
+    if not state_data:
+        logger.error("Failed to get state-level timely payment data")
+        return {district: None for district in districts}
+    
+    processed_state_data = process_state_timely_payment_data(state_data)
+    if not processed_state_data:
+        logger.error("Failed to process state-level timely payment data")
+        return {district: None for district in districts}
+    
+    def analyze_one(district):
+        # Unknown districts fail like any other district in a batch (None), whatever the format
+        if district not in processed_state_data["by_name"]:
+            logger.error(f"Unknown district: {district}")
+            return None
+        try:
+            return _analyze_district(date, district, processed_state_data, output_format, timestamp)
+        except Exception as e:
+            logger.error(f"Error analyzing district {district}: {str(e)}")
+            return None
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(districts, executor.map(analyze_one, districts)))
+
 if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description='NREGS Timely Payment Data Analysis')
     parser.add_argument('--date', type=str, help='Date in YYYY-MM-DD format')
-    parser.add_argument('--district', type=str, required=True, help='District name')
+    parser.add_argument('--district', type=str, nargs='+', required=True,
+                        help='District name (several names analyze the districts in one batch)')
     parser.add_argument('--output', type=str, default="text", choices=["text", "json"],
                         help='Output format (text or json)')
     
     args = parser.parse_args()
     
     try:
-        result = main(args.date, args.district, args.output)
+        if len(args.district) == 1:
+            result = main(args.date, args.district[0], args.output)
+        else:
+            result = analyze_districts(args.date, args.district, args.output)
         
         if args.output == "json":
             print(json.dumps(result, indent=4))
-        else:
+        elif len(args.district) == 1:
             print(result)
+        else:
+            for name, analysis in result.items():
+                print(f"===== {name} =====")
+                print(analysis)
     except Exception as e:
         logger.error(f"Error in main execution: {str(e)}")
         print(f"Error: {str(e)}")
\ No newline at end of file
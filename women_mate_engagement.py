@@ -1,12 +1,19 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import re
 import json
-import statistics
+import gzip
+import hashlib
 import os
+import tempfile
+import time
+import atexit
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, Optional
-import anthropic
-from dotenv import load_dotenv
 
 # Set up logging
 logging.basicConfig(
@@ -19,20 +26,142 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Load environment variables from .env file
-load_dotenv()
+# Create output directory once for all files written by this module
+os.makedirs("output", exist_ok=True)
 
-def get_women_mate_data(date, district=None):
+# On-disk cache for dashboard API responses; today's figures still change, so they expire quickly
+CACHE_DIR = "cache"
+TODAY_CACHE_TTL_SECONDS = 60
+HISTORICAL_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Serve an expired cache entry instead of failing when the dashboard API is unreachable
+STALE_FALLBACK_ENABLED = True
+
+# Claude responses are cached by prompt hash; hits and misses are counted for the logs
+CLAUDE_CACHE_TTL_SECONDS = 24 * 60 * 60
+_claude_cache_stats = {"hits": 0, "misses": 0}
+_claude_cache_stats_lock = threading.Lock()
+
+def _count_claude_cache(outcome):
+    """Count a Claude cache "hits" or "misses" outcome and return the (hits, misses) totals."""
+    with _claude_cache_stats_lock:
+        _claude_cache_stats[outcome] += 1
+        return _claude_cache_stats["hits"], _claude_cache_stats["misses"]
+
+# Background pool for writing Claude output dumps without blocking the caller
+_IO_POOL = ThreadPoolExecutor(max_workers=2)
+atexit.register(_IO_POOL.shutdown, wait=True)
+
+def _write_file(path, content, description):
+    """Write text to a file (gzip-compressed for .gz paths) and log where it was saved (runs on _IO_POOL)"""
+    try:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, 'wt', encoding='utf-8') as f:
+            f.write(content)
+        logger.info(f"{description} saved to {path}")
+    except OSError as e:
+        logger.error(f"Failed to save {description.lower()} to {path}: {str(e)}")
+
+# HTTP session shared by all dashboard API requests (keep-alive + connection pooling)
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    # Exponential backoff with jitter, capped at 30s, for transient gateway errors; other
+    # statuses (e.g. 4xx) are permanent and returned straight away
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        backoff_jitter=0.5,
+        backoff_max=30,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+        # Hand back the last response once retries are exhausted so its status gets logged
+        raise_on_status=False
+    )
+))
+atexit.register(SESSION.close)
+
+# Circuit breaker for the dashboard API: after CIRCUIT_BREAKER_THRESHOLD consecutive failed
+# fetches (connection errors or 5xx after retries), skip requests for CIRCUIT_BREAKER_COOLDOWN_SECONDS
+CIRCUIT_BREAKER_THRESHOLD = 3
+CIRCUIT_BREAKER_COOLDOWN_SECONDS = 60
+_circuit_breaker = {"failures": 0, "open_until": 0.0}
+_circuit_breaker_lock = threading.Lock()
+
+def _record_fetch_result(success):
+    """Update the dashboard circuit breaker with the outcome of one fetch."""
+    with _circuit_breaker_lock:
+        if success:
+            _circuit_breaker["failures"] = 0
+            return
+        _circuit_breaker["failures"] += 1
+        if _circuit_breaker["failures"] >= CIRCUIT_BREAKER_THRESHOLD:
+            _circuit_breaker["open_until"] = time.time() + CIRCUIT_BREAKER_COOLDOWN_SECONDS
+            logger.warning(f"Dashboard API failed {_circuit_breaker['failures']} times in a row, "
+                           f"pausing requests for {CIRCUIT_BREAKER_COOLDOWN_SECONDS}s")
+
+def _write_cache_file(path, data):
+    """Write a JSON cache entry atomically so a concurrent reader never sees a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Each writer gets its own temp file, so concurrent processes/threads writing the same key never interleave
+    tmp_file = None
+    try:
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+            tmp_file = f.name
+            json.dump(data, f)
+        os.replace(tmp_file, path)
+    except BaseException:
+        if tmp_file and os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+def _load_stale_cache(cache_file):
+    """Return an expired cache entry to fall back on while the dashboard is unavailable, or None."""
+    try:
+        age_minutes = (time.time() - os.path.getmtime(cache_file)) / 60
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    logger.warning(f"Dashboard API unavailable, using stale women mate engagement data "
+                   f"({age_minutes:.0f} minutes old) from {cache_file}")
+    return data
+
+def _cache_key_part(value):
+    """Normalise a user-supplied date/district for use in a cache filename (hashed if nothing safe is left)."""
+    normalised = re.sub(r'\W+', '_', value.strip().lower()).strip('_')
+    return normalised or hashlib.sha256(value.encode('utf-8')).hexdigest()[:16]
+
+def get_women_mate_data(date, district=None, use_cache=True):
     """
     Fetch women mate engagement data from the NREGS MP dashboard API
     
+    Successful responses are cached under CACHE_DIR per (date, district), for
+    TODAY_CACHE_TTL_SECONDS when date is today and HISTORICAL_CACHE_TTL_SECONDS otherwise.
+    If the API is unreachable (connection error, timeout, 5xx or open circuit), the last
+    cached response is returned regardless of age unless STALE_FALLBACK_ENABLED is off.
+    
     Args:
         date (str): Date in YYYY-MM-DD format
         district (str, optional): District name if specific district data is needed
+        use_cache (bool, optional): Read and write the response cache
     
     Returns:
         dict: API response data
     """
+    cache_file = os.path.join(CACHE_DIR, f"women_mate_{_cache_key_part(date)}_{_cache_key_part(district) if district else 'STATE'}.json")
+    if use_cache:
+        ttl = TODAY_CACHE_TTL_SECONDS if date == datetime.now().strftime("%Y-%m-%d") else HISTORICAL_CACHE_TTL_SECONDS
+        try:
+            if time.time() - os.path.getmtime(cache_file) < ttl:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                logger.info(f"Using cached women mate engagement data from {cache_file}")
+                return data
+        except (OSError, ValueError):
+            pass
+    
     base_url = "https://dashboard.nregsmp.org/api/employment_workers/women-mate-engagement"
     
     if district:
@@ -40,22 +169,84 @@ def get_women_mate_data(date, district=None):
     else:
         url = f"{base_url}?date={date}"
     
+    allow_stale = use_cache and STALE_FALLBACK_ENABLED
+    
+    # Don't hit a dashboard that keeps failing until the cooldown has passed
+    if time.time() < _circuit_breaker["open_until"]:
+        logger.error(f"Skipping women mate engagement request, dashboard API circuit is open: {url}")
+        return _load_stale_cache(cache_file) if allow_stale else None
+    
     logger.info(f"Fetching women mate engagement data from: {url}")
-    response = requests.get(url)
+    try:
+        # Transient 502/503/504 responses and connection errors are retried by the session adapter
+        response = SESSION.get(url, timeout=(3.05, 30))
+    except requests.RequestException as e:
+        _record_fetch_result(False)
+        logger.error(f"Failed to fetch women mate engagement data after retries: {str(e)}")
+        return _load_stale_cache(cache_file) if allow_stale else None
+    
+    # Client errors mean the dashboard is up, so only 5xx responses count against the circuit
+    _record_fetch_result(response.status_code < 500)
     
     if response.status_code == 200:
         logger.info(f"Successfully fetched women mate engagement data from: {url}")
-        return response.json()
+        data = response.json()
+        if use_cache:
+            _write_cache_file(cache_file, data)
+        return data
     else:
         logger.error(f"Failed to fetch women mate engagement data: {response.status_code}")
+        if allow_stale and response.status_code >= 500:
+            return _load_stale_cache(cache_file)
         return None
 
-def process_state_women_mate_data(data):
+# Metrics averaged over districts/blocks, in the order _format_and_sum_records returns their sums
+_AVERAGED_METRICS = (
+    'total_registered_mates',
+    'women_mates',
+    'women_mate_reg_percentage',
+    'women_mate_work_percentage',
+    'women_mate_marks'
+)
+
+def _format_and_sum_records(records):
+    """
+    Round district/block records in place, total their metrics and find the
+    highest/lowest women mate marks records in a single pass
+    
+    Args:
+        records (list): District or block records from the API
+    
+    Returns:
+        tuple: (sums of the _AVERAGED_METRICS after rounding in the same order,
+                highest marks record, lowest marks record). Ties resolve the same way
+                as a stable descending sort: first highest, last lowest.
+    """
+    sums = [0] * len(_AVERAGED_METRICS)
+    highest = lowest = None
+    for record in records:
+        for key, value in record.items():
+            if isinstance(value, float):
+                record[key] = round(value, 2)
+        
+        for i, metric in enumerate(_AVERAGED_METRICS):
+            sums[i] += record.get(metric, 0)
+        
+        marks = record.get('women_mate_marks', 0)
+        if highest is None or marks > highest.get('women_mate_marks', 0):
+            highest = record
+        if lowest is None or marks <= lowest.get('women_mate_marks', 0):
+            lowest = record
+    return sums, highest, lowest
+
+def process_state_women_mate_data(data, target_district=None):
     """
     Process state-level women mate engagement data to extract top/bottom districts and state averages
     
     Args:
         data (dict): State-level NREGS women mate engagement data
+        target_district (str, optional): When given, only this district's rank is computed
+            (by counting) instead of sorting every district
     
     Returns:
         dict: Processed data with top/bottom districts and state averages
@@ -66,30 +257,35 @@ def process_state_women_mate_data(data):
     
     logger.info(f"Processing state women mate data with {len(data['results'])} districts")
     
-    # Format all data points to have 2 decimal places
-    for district in data['results']:
-        for key, value in district.items():
-            if isinstance(value, float):
-                district[key] = round(value, 2)
-    
-    # Sort districts by women mate marks (highest to lowest)
-    sorted_districts = sorted(data['results'], key=lambda x: x.get('women_mate_marks', 0), reverse=True)
-    
-    # Add rank to each district
-    district_ranks = {}
-    for i, district in enumerate(sorted_districts):
-        district_ranks[district['group_name']] = i + 1
-    
-    # Extract top 1 and bottom 1 districts
-    top_district = sorted_districts[0]
-    bottom_district = sorted_districts[-1]
+    # Format all data points to have 2 decimal places, totalling the key metrics and
+    # picking the top 1 and bottom 1 districts in the same pass
+    sums, top_district, bottom_district = _format_and_sum_records(data['results'])
+    num_districts = len(data['results'])
+    
+    # Index districts by name so callers look up the target's full record directly
+    by_name = {d['group_name']: d for d in data['results']}
+    
+    district_ranks = None
+    target_rank = None
+    if target_district:
+        # Rank only the target: districts with higher marks, plus ties listed before it
+        # (matching the order a stable descending sort would give)
+        position = next((i for i, d in enumerate(data['results']) if d['group_name'] == target_district), None)
+        if position is not None:
+            target_marks = data['results'][position].get('women_mate_marks', 0)
+            target_rank = 1 + sum(
+                1 for i, d in enumerate(data['results'])
+                if d.get('women_mate_marks', 0) > target_marks
+                or (i < position and d.get('women_mate_marks', 0) == target_marks)
+            )
+    else:
+        # Sort districts by women mate marks (highest to lowest) and rank all of them
+        sorted_districts = sorted(data['results'], key=lambda x: x.get('women_mate_marks', 0), reverse=True)
+        district_ranks = {d['group_name']: i + 1 for i, d in enumerate(sorted_districts)}
     
     # Calculate state averages for key metrics
-    avg_total_registered_mates = round(statistics.mean([d.get('total_registered_mates', 0) for d in data['results']]), 2)
-    avg_women_mates = round(statistics.mean([d.get('women_mates', 0) for d in data['results']]), 2)
-    avg_women_mate_reg_percentage = round(statistics.mean([d.get('women_mate_reg_percentage', 0) for d in data['results']]), 2)
-    avg_women_mate_work_percentage = round(statistics.mean([d.get('women_mate_work_percentage', 0) for d in data['results']]), 2)
-    avg_women_mate_marks = round(statistics.mean([d.get('women_mate_marks', 0) for d in data['results']]), 2)
+    (avg_total_registered_mates, avg_women_mates, avg_women_mate_reg_percentage,
+     avg_women_mate_work_percentage, avg_women_mate_marks) = [round(total / num_districts, 2) for total in sums]
     
     logger.info(f"Top district: {top_district['group_name']} with women mate marks {top_district.get('women_mate_marks', 0)}")
     logger.info(f"Bottom district: {bottom_district['group_name']} with women mate marks {bottom_district.get('women_mate_marks', 0)}")
@@ -107,7 +303,9 @@ def process_state_women_mate_data(data):
             "women_mate_marks": avg_women_mate_marks
         },
         "district_ranks": district_ranks,
-        "total_districts": len(sorted_districts)
+        "target_rank": target_rank,
+        "by_name": by_name,
+        "total_districts": num_districts
     }
 
 def process_district_women_mate_data(data):
@@ -126,25 +324,16 @@ def process_district_women_mate_data(data):
     
     logger.info(f"Processing district women mate data with {len(data['results'])} blocks")
     
-    # Format all data points to have 2 decimal places
-    for block in data['results']:
-        for key, value in block.items():
-            if isinstance(value, float):
-                block[key] = round(value, 2)
+    # Format all data points to have 2 decimal places, totalling the key metrics in the same pass
+    sums, highest_block, lowest_block = _format_and_sum_records(data['results'])
+    num_blocks = len(data['results'])
     
-    # Sort blocks by women mate marks (highest to lowest)
+    # Sort blocks by women mate marks (highest to lowest) for the prompt
     sorted_blocks = sorted(data['results'], key=lambda x: x.get('women_mate_marks', 0), reverse=True)
     
     # Calculate district averages
-    avg_total_registered_mates = round(statistics.mean([b.get('total_registered_mates', 0) for b in data['results']]), 2)
-    avg_women_mates = round(statistics.mean([b.get('women_mates', 0) for b in data['results']]), 2)
-    avg_women_mate_reg_percentage = round(statistics.mean([b.get('women_mate_reg_percentage', 0) for b in data['results']]), 2)
-    avg_women_mate_work_percentage = round(statistics.mean([b.get('women_mate_work_percentage', 0) for b in data['results']]), 2)
-    avg_women_mate_marks = round(statistics.mean([b.get('women_mate_marks', 0) for b in data['results']]), 2)
-    
-    # Get highest and lowest performing blocks
-    highest_block = sorted_blocks[0] if sorted_blocks else None
-    lowest_block = sorted_blocks[-1] if sorted_blocks else None
+    (avg_total_registered_mates, avg_women_mates, avg_women_mate_reg_percentage,
+     avg_women_mate_work_percentage, avg_women_mate_marks) = [round(total / num_blocks, 2) for total in sums]
     
     if highest_block and lowest_block:
         logger.info(f"Highest performing block: {highest_block['group_name']} with women mate marks {highest_block.get('women_mate_marks', 0)}")
@@ -155,7 +344,7 @@ def process_district_women_mate_data(data):
     return {
         "blocks": sorted_blocks,
         "district_summary": {
-            "total_blocks": len(data['results']),
+            "total_blocks": num_blocks,
             "average_total_registered_mates": avg_total_registered_mates,
             "average_women_mates": avg_women_mates,
             "average_women_mate_reg_percentage": avg_women_mate_reg_percentage,
@@ -168,20 +357,8 @@ def process_district_women_mate_data(data):
         }
     }
 
-def generate_women_mate_analysis(state_data, district_data, target_district):
-    """
-    Generate analysis report using Claude 3.7 with thinking mode
-    
-    Args:
-        state_data (dict): Processed state data
-        district_data (dict): Processed district data
-        target_district (str): Name of the target district
-    
-    Returns:
-        str: Analysis report
-    """
-    # Create prompt template
-    prompt = """
+# Prompt template for the women mate engagement analysis, filled in by generate_women_mate_analysis
+_PROMPT_TEMPLATE = """
 You are an AI analyst tasked with evaluating the performance of districts and blocks in Madhya Pradesh, India,
 based on the National Rural Employment Guarantee Act (NREGA) data. Your goal is to provide a concise, 
 professional analysis of a target district's performance in relation to the state's top and bottom performers,
@@ -241,45 +418,95 @@ Ensure that your analysis is based solely on the provided data and focuses on th
 Your response should contain data to validate your points. give key insights of district,block and improvement potential. 
 Include district ranking/score in the component, top districts, improvement potential and suggestions, blocks in the district who are performig good and bad. 
 """
+
+def _prompt_json(obj):
+    """Serialize data for the Claude prompt as compact JSON (the C encoder is only used without indent)"""
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
+
+def generate_women_mate_analysis(state_data, district_data, target_district, use_cache=True, timestamp=None):
+    """
+    Generate analysis report using Claude 3.7 with thinking mode
     
-    # Format the prompt with actual data
-    formatted_prompt = prompt.format(
-        state_data=json.dumps(state_data, indent=2),
-        district_data=json.dumps(district_data, indent=2),
-        target_district=target_district
+    Args:
+        state_data (dict): Processed state data
+        district_data (dict): Processed district data
+        target_district (str): Name of the target district
+        use_cache (bool, optional): Reuse a cached Claude response for an identical prompt
+        timestamp (str, optional): Run timestamp used in output filenames
+    
+    Returns:
+        str: Analysis report
+    """
+    # Fill in the prompt template with actual data
+    formatted_prompt = (
+        _PROMPT_TEMPLATE
+        .replace("{state_data}", _prompt_json(state_data))
+        .replace("{district_data}", _prompt_json(district_data))
+        .replace("{target_district}", target_district)
     )
     
     # Log the prompt (optional, can be disabled for production)
-    logger.debug(f"Prompt to Claude for women mate analysis:\n{formatted_prompt}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Prompt to Claude for women mate analysis:\n%s", formatted_prompt)
     
     # Call Claude 3.7 API with thinking mode
-    return call_claude_api(formatted_prompt)
+    return call_claude_api(formatted_prompt, use_cache, target_district, timestamp)
 
-def call_claude_api(prompt):
+def call_claude_api(prompt, use_cache=True, district=None, timestamp=None):
     """
     Call Claude 3.7 API with thinking mode enabled
     
+    Responses are cached under CACHE_DIR/claude keyed by the SHA-256 of model and prompt for
+    CLAUDE_CACHE_TTL_SECONDS; a cache hit returns without calling the API or writing output files.
+    
     Args:
         prompt (str): Prompt to send to Claude
+        use_cache (bool, optional): Read and write the prompt-hash response cache
+        district (str, optional): District name added to the output filenames so batch runs don't collide
+        timestamp (str, optional): Run timestamp used in output filenames, defaults to now
     
     Returns:
         str: Claude's response
     """
+    # Set model
+    model = "claude-3-7-sonnet-20250219"
+    
+    # Return a cached response for an identical request
+    cache_file = os.path.join(CACHE_DIR, "claude", f"{hashlib.sha256((model + prompt).encode('utf-8')).hexdigest()}.json")
+    if use_cache:
+        try:
+            if time.time() - os.path.getmtime(cache_file) < CLAUDE_CACHE_TTL_SECONDS:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    response_text = json.load(f)["response_text"]
+                hits, misses = _count_claude_cache("hits")
+                logger.info(f"Claude cache hit ({hits} hits, {misses} misses): {cache_file}")
+                return response_text
+        except (OSError, ValueError, KeyError):
+            pass
+        hits, misses = _count_claude_cache("misses")
+        logger.info(f"Claude cache miss ({hits} hits, {misses} misses)")
+    
+    # Load environment variables from .env file only when the key isn't already set
     api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        from dotenv import load_dotenv
+        load_dotenv()
+        api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
         error_msg = "ANTHROPIC_API_KEY environment variable not set"
         logger.error(error_msg)
         raise ValueError(error_msg)
     
-    # Set model
-    model = "claude-3-7-sonnet-20250219"
     logger.info(f"Using Claude model: {model} with thinking mode")
     
     try:
+        # Imported on first use: anthropic pulls in httpx and pydantic, which cached runs never need
+        import anthropic
         client = anthropic.Anthropic(api_key=api_key)
         
-        # Request creation with thinking mode
-        response = client.messages.create(
+        # Stream the response with thinking mode, collecting text as it arrives
+        text_chunks = []
+        with client.messages.stream(
             model=model,
             max_tokens=20000,
             thinking={
@@ -287,7 +514,10 @@ def call_claude_api(prompt):
                 "budget_tokens": 16000
             },
             messages=[{"role": "user", "content": prompt}]
-        )
+        ) as stream:
+            for text in stream.text_stream:
+                text_chunks.append(text)
+            response = stream.get_final_message()
         
         # Log token usage
         prompt_tokens = response.usage.input_tokens
@@ -296,52 +526,43 @@ def call_claude_api(prompt):
         
         logger.info(f"Token usage - Prompt: {prompt_tokens}, Completion: {completion_tokens}, Total: {total_tokens}")
         
-        # Check and log thinking output
-        thinking_output = None
-        if hasattr(response, 'thinking') and response.thinking:
-            thinking_text = response.thinking.thinking_text
-            thinking_tokens = response.thinking.tokens
-            logger.info(f"Thinking mode used: {thinking_tokens} tokens")
-            
-            # Create output directory if it doesn't exist
-            os.makedirs("output", exist_ok=True)
-            
-            # Save thinking to file
-            thinking_file = os.path.join("output", f"women_mate_thinking_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
-            with open(thinking_file, 'w', encoding='utf-8') as f:
-                f.write(thinking_text)
-            logger.info(f"Thinking output saved to {thinking_file}")
-            
-            thinking_output = thinking_text
+        # Output filenames carry the district so concurrent batch runs don't overwrite each other
+        if not timestamp:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        file_suffix = f"{district.lower()}_{timestamp}" if district else timestamp
+        
+        # Thinking arrives as "thinking" content blocks of the final message, collected once
+        thinking_output = "".join(block.thinking for block in response.content if block.type == "thinking") or None
+        # (it is saved only as "thinking_text" in the compressed response dump below)
+        if thinking_output:
+            logger.info(f"Thinking mode used: {len(thinking_output)} characters of thinking")
         else:
             logger.info("No thinking output received")
         
-        # Extract the actual response text
-        response_text = ""
-        for content_block in response.content:
-            if hasattr(content_block, 'text'):
-                response_text += content_block.text
-        
-        # Create output directory if it doesn't exist
-        os.makedirs("output", exist_ok=True)
+        # Assemble the response text from the streamed chunks
+        response_text = "".join(text_chunks)
         
-        # Save full response to file
-        response_file = os.path.join("output", f"women_mate_claude_response_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-        with open(response_file, 'w', encoding='utf-8') as f:
-            response_data = {
-                "model": model,
-                "response_text": response_text,
-                "thinking_text": thinking_output,
-                "token_usage": {
-                    "prompt_tokens": prompt_tokens,
-                    "completion_tokens": completion_tokens,
-                    "total_tokens": total_tokens,
-                    "thinking_tokens": thinking_tokens if hasattr(response, 'thinking') and response.thinking else 0
-                }
+        # Save full response to a gzip-compressed file (read back with gzip.open(path, 'rt'));
+        # these archival dumps repeat the analysis and thinking text for every run
+        response_file = os.path.join("output", f"women_mate_claude_response_{file_suffix}.json.gz")
+        response_data = {
+            "model": model,
+            "response_text": response_text,
+            "thinking_text": thinking_output,
+            "token_usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": total_tokens
             }
-            json.dump(response_data, f, indent=2)
+        }
+        _IO_POOL.submit(_write_file, response_file, json.dumps(response_data, indent=2), "Full response data")
         
-        logger.info(f"Full response data saved to {response_file}")
+        # A failed cache write must not throw away the response that was just paid for
+        if use_cache:
+            try:
+                _write_cache_file(cache_file, {"response_text": response_text, "thinking_text": thinking_output})
+            except OSError as e:
+                logger.warning(f"Failed to cache Claude response to {cache_file}: {str(e)}")
         
         return response_text
     
@@ -349,7 +570,7 @@ def call_claude_api(prompt):
         logger.error(f"Error calling Claude API: {str(e)}")
         raise
 
-def main(date=None, district=None, output_format="text"):
+def main(date=None, district=None, output_format="text", use_cache=True):
     """
     Main function to fetch and process NREGS women mate engagement data, then analyze it
     
@@ -357,29 +578,68 @@ def main(date=None, district=None, output_format="text"):
         date (str, optional): Date in YYYY-MM-DD format
         district (str, optional): District name for specific data
         output_format (str, optional): Output format ('text' or 'json')
+        use_cache (bool, optional): Reuse cached dashboard API responses and Claude analyses
     
     Returns:
         Union[str, dict]: Analysis result in specified format
     """
     logger.info(f"Starting NREGS women mate engagement analysis for district: {district}, date: {date if date else 'current'}")
     
+    # One timestamp per run, shared by all output filenames
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
+    
     # Use current date if none provided
     if not date:
-        date = datetime.now().strftime("%Y-%m-%d")
+        date = now.strftime("%Y-%m-%d")
         logger.info(f"Using current date: {date}")
     
-    # Get state-level data
-    logger.info("Fetching state-level women mate engagement data")
-    state_data = get_women_mate_data(date)
+    # Fetch state-level and district-level data concurrently
+    logger.info("Fetching state-level and district-level women mate engagement data")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        state_future = executor.submit(get_women_mate_data, date, None, use_cache)
+        district_future = executor.submit(get_women_mate_data, date, district, use_cache) if district else None
+        state_data = state_future.result()
+        district_data = district_future.result() if district_future else None
+    
     if not state_data:
         logger.error("Failed to get state-level women mate engagement data")
         return None
     
-    processed_state_data = process_state_women_mate_data(state_data)
+    processed_state_data = process_state_women_mate_data(state_data, district)
     if not processed_state_data:
         logger.error("Failed to process state-level women mate engagement data")
         return None
     
+    # Check if district is provided
+    if not district:
+        error_msg = "District name is required for analysis"
+        logger.error(error_msg)
+        return error_msg
+    
+    # Check district-level data
+    if not district_data:
+        logger.error(f"Failed to get women mate engagement data for district: {district}")
+        return None
+    
+    return _analyze_district(date, district, processed_state_data, output_format, timestamp, use_cache, district_data)
+
+def _analyze_district(date, district, processed_state_data, output_format, timestamp, use_cache=True, district_data=None):
+    """
+    Process one district against already processed state data, analyze it and save the output
+    
+    Args:
+        date (str): Date in YYYY-MM-DD format
+        district (str): District name
+        processed_state_data (dict): Output of process_state_women_mate_data
+        output_format (str): Output format ('text' or 'json')
+        timestamp (str): Run timestamp used in output filenames
+        use_cache (bool, optional): Reuse cached dashboard API responses and Claude analyses
+        district_data (dict, optional): District-level women mate engagement data, fetched if not given
+    
+    Returns:
+        Union[str, dict]: Analysis result in specified format
+    """
     result = {
         "date": date,
         "state_data": {
@@ -389,15 +649,10 @@ def main(date=None, district=None, output_format="text"):
         }
     }
     
-    # Check if district is provided
-    if not district:
-        error_msg = "District name is required for analysis"
-        logger.error(error_msg)
-        return error_msg
-    
-    # Get district-level data
-    logger.info(f"Fetching women mate engagement data for district: {district}")
-    district_data = get_women_mate_data(date, district)
+    # Get district-level data unless it was fetched by the caller
+    if district_data is None:
+        logger.info(f"Fetching women mate engagement data for district: {district}")
+        district_data = get_women_mate_data(date, district, use_cache)
     if not district_data:
         logger.error(f"Failed to get women mate engagement data for district: {district}")
         return None
@@ -408,15 +663,12 @@ def main(date=None, district=None, output_format="text"):
         return None
     
     # Get district rank
-    district_rank = processed_state_data["district_ranks"].get(district, None)
+    district_ranks = processed_state_data["district_ranks"]
+    district_rank = district_ranks.get(district) if district_ranks is not None else processed_state_data["target_rank"]
     total_districts = processed_state_data["total_districts"]
     
     # Find the district data in the state data for complete information
-    target_district_data = None
-    for d in state_data['results']:
-        if d['group_name'] == district:
-            target_district_data = d
-            break
+    target_district_data = processed_state_data["by_name"].get(district)
     
     result["district_data"] = {
         "district_name": district,
@@ -427,22 +679,21 @@ def main(date=None, district=None, output_format="text"):
     }
     
     # Generate analysis using Claude
-    logger.info("Generating women mate engagement analysis using Claude 3.7")
+    logger.info(f"Generating women mate engagement analysis for {district} using Claude 3.7")
     analysis = generate_women_mate_analysis(
         result["state_data"], 
         result["district_data"], 
-        district
+        district,
+        use_cache,
+        timestamp
     )
     
-    # Create output directory if it doesn't exist
-    os.makedirs("output", exist_ok=True)
-    
     # Create output based on requested format
     if output_format == "json":
         result["analysis"] = analysis
         
         # Save output to file
-        filename = os.path.join("output", f"nregs_women_mate_analysis_{district.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        filename = os.path.join("output", f"nregs_women_mate_analysis_{district.lower()}_{timestamp}.json")
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(result, f, indent=4)
         logger.info(f"Analysis saved to {filename}")
@@ -450,31 +701,100 @@ def main(date=None, district=None, output_format="text"):
         return result
     else:
         # Save output to file
-        filename = os.path.join("output", f"nregs_women_mate_analysis_{district.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+        filename = os.path.join("output", f"nregs_women_mate_analysis_{district.lower()}_{timestamp}.txt")
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(analysis)
         logger.info(f"Analysis saved to {filename}")
         
         return analysis
 
+def analyze_districts(date=None, districts=None, output_format="text", max_workers=3, use_cache=True):
+    """
+    Analyze several districts in one run, fetching and processing the state-level data only once
+    
+    Districts are fetched and analyzed concurrently, with at most max_workers in flight.
+    
+    Args:
+        date (str, optional): Date in YYYY-MM-DD format
+        districts (list): District names to analyze
+        output_format (str, optional): Output format ('text' or 'json')
+        max_workers (int, optional): Maximum number of districts processed at the same time
+        use_cache (bool, optional): Reuse cached dashboard API responses and Claude analyses
+    
+    Returns:
+        dict: District name mapped to its analysis result in specified format (None on failure)
+    """
+    logger.info(f"Starting NREGS women mate engagement analysis for {len(districts or [])} districts, date: {date if date else 'current'}")
+    
+    if not districts:
+        logger.error("At least one district name is required for analysis")
+        return {}
+    
+    # One timestamp per run, shared by all output filenames
+    now = datetime.now()
+    timestamp = now.strftime('%Y%m%d_%H%M%S')
+    
+    # Use current date if none provided
+    if not date:
+        date = now.strftime("%Y-%m-%d")
+        logger.info(f"Using current date: {date}")
+    
+    # Get and process state-level data once for all districts
+    logger.info("Fetching state-level women mate engagement data")
+    state_data = get_women_mate_data(date, None, use_cache)
+    if not state_data:
+        logger.error("Failed to get state-level women mate engagement data")
+        return {district: None for district in districts}
+    
+    # Every district needs a rank, so let the state processor sort once
+    processed_state_data = process_state_women_mate_data(state_data)
+    if not processed_state_data:
+        logger.error("Failed to process state-level women mate engagement data")
+        return {district: None for district in districts}
+    
+    def analyze_one(district):
+        try:
+            return _analyze_district(date, district, processed_state_data, output_format, timestamp, use_cache)
+        except Exception as e:
+            logger.error(f"Error analyzing district {district}: {str(e)}")
+            return None
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(districts, executor.map(analyze_one, districts)))
+
 if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description='NREGS Women Mate Engagement Data Analysis')
     parser.add_argument('--date', type=str, help='Date in YYYY-MM-DD format')
-    parser.add_argument('--district', type=str, required=True, help='District name')
+    parser.add_argument('--district', type=str, nargs='+', required=True,
+                        help='District name (several names analyze the districts in one batch)')
     parser.add_argument('--output', type=str, default="text", choices=["text", "json"],
                         help='Output format (text or json)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always fetch fresh data and call Claude instead of reusing cached responses')
+    parser.add_argument('--no-fallback', action='store_true',
+                        help='Fail instead of using stale cached data when the dashboard API is unavailable')
     
     args = parser.parse_args()
     
+    if args.no_fallback:
+        STALE_FALLBACK_ENABLED = False
+    
     try:
-        result = main(args.date, args.district, args.output)
+        if len(args.district) == 1:
+            result = main(args.date, args.district[0], args.output, use_cache=not args.no_cache)
+        else:
+            result = analyze_districts(args.date, args.district, args.output, use_cache=not args.no_cache)
         
         if args.output == "json":
             print(json.dumps(result, indent=4))
-        else:
+        elif len(args.district) == 1:
             print(result)
+        else:
+            for name, analysis in result.items():
+                print(f"===== {name} =====")
+                print(analysis)
     except Exception as e:
         logger.error(f"Error in main execution: {str(e)}")
         print(f"Error: {str(e)}")
\ No newline at end of file